@@ -0,0 +1,236 @@
+
+# throughput and latency benchmarks of AES_Program, with regression tracking:
+#   python AES_Benchmark.py run [--preset quick|default|full] [--sizes 16 1024 ...] [--only text] [--max-case-time 60] [--output results.json]
+#   python AES_Benchmark.py compare baseline.json results.json [--threshold 0.1]
+# compare exits with code 1 when some case got slower than the baseline by more than threshold
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import AES_Program
+
+class AES_Benchmark:
+    keyLengths = [16, 24, 32] # 128, 192 and 256-bit keys
+    # payload sizes in bytes. a case whose calls would take longer than maxCaseTime (estimated from the
+    # throughput it had at the size before) is skipped - without numpy most of the large sizes of 'full' are
+    presets = {
+        'quick': [16, 1024, 64 * 1024],
+        'default': [16, 1024, 64 * 1024, 1 << 20],
+        'full': [16, 1024, 64 * 1024, 1 << 20, 16 << 20, 100 << 20],
+    }
+    modeOperations = ['ECB-encrypt', 'ECB-decrypt', 'CBC-encrypt', 'CBC-decrypt', 'CTR-encrypt', 'CTR-decrypt', 'GCM-encrypt', 'GCM-decrypt']
+    textOperations = ['ECB-encrypt', 'ECB-decrypt', 'CBC-encrypt', 'CBC-decrypt']
+
+    def __init__(self, minTime = 0.5, minCalls = 3, maxCalls = 100000, measureMemory = True, maxCaseTime = 60):
+        self.minTime = minTime # seconds spent measuring each case
+        self.minCalls = minCalls # calls measured even if they take longer than minTime
+        self.maxCalls = maxCalls
+        self.measureMemory = measureMemory
+        self.maxCaseTime = maxCaseTime # seconds a case may be expected to take, larger sizes are skipped (0 - no limit)
+        self.program = AES_Program.AES_Program()
+
+    def Measure(self, function, byteCount):
+        # call function until minTime has passed, return throughput and latency of the calls
+        function() # warm-up (fills key schedule cache, builds tables)
+        times = []
+        started = time.perf_counter()
+        while len(times) < self.maxCalls and (len(times) < self.minCalls or time.perf_counter() - started < self.minTime):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        times.sort()
+        p50 = times[len(times) // 2]
+        p99 = times[min(len(times) - 1, (len(times) * 99) // 100)]
+        result = {
+            "bytes": byteCount,
+            "calls": len(times),
+            "MBps": byteCount / p50 / 1e6 if p50 > 0 and byteCount else None,
+            "p50": p50,
+            "p99": p99,
+        }
+        if self.measureMemory:
+            result["peakMemory"] = self.MeasureMemory(function)
+        return result
+
+    def MeasureMemory(self, function):
+        # peak memory (bytes) allocated during one call, measured in a separate call -
+        # tracing allocations slows the calls down, so it is not done while timing them
+        tracemalloc.start()
+        try:
+            function()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def PrimitiveCases(self):
+        # (name, function, bytes processed per call) of the single-block functions
+        block = os.urandom(16)
+        for keyLength in self.keyLengths:
+            key = os.urandom(keyLength)
+            schedule = AES_Program.AESKeySchedule(key)
+            bits = keyLength * 8
+            aes = AES_Program.AES()
+            tTable = AES_Program.AESTTable()
+            yield "primitive/AESKeyExpansion/{}".format(bits), lambda aes = aes, key = key: aes.AESKeyExpansion(key), 0
+            yield "primitive/AESEncrypt/{}".format(bits), lambda aes = aes, key = key: aes.AESEncrypt(block, key), 16
+            yield "primitive/AESDecrypt/{}".format(bits), lambda aes = aes, key = key: aes.AESDecrypt(block, key), 16
+            yield "primitive/AESTTable.AESEncryptWithSchedule/{}".format(bits), lambda tTable = tTable, schedule = schedule: tTable.AESEncryptWithSchedule(block, schedule), 16
+            yield "primitive/AESTTable.AESDecryptWithSchedule/{}".format(bits), lambda tTable = tTable, schedule = schedule: tTable.AESDecryptWithSchedule(block, schedule), 16
+        # round functions do not depend on the key length
+        aes = AES_Program.AES()
+        aes.expKey = AES_Program.AESKeySchedule(os.urandom(16)).expKey
+        aes.state = bytearray(block)
+        yield "primitive/AESSubBytes", lambda: aes.AESSubBytes(0), 16
+        yield "primitive/AESShiftRows", lambda: aes.AESShiftRows(0), 16
+        yield "primitive/AESMixColumns", lambda: aes.AESMixColumns(0), 16
+        yield "primitive/AESAddRoundKey", lambda: aes.AESAddRoundKey(1), 16
+        yield "primitive/AESInvSubBytes", lambda: aes.AESSubBytes(1), 16
+        yield "primitive/AESInvShiftRows", lambda: aes.AESShiftRows(1), 16
+        yield "primitive/AESInvMixColumns", lambda: aes.AESMixColumns(1), 16
+
+    def ModeCases(self, sizes):
+        # (name, function, bytes processed per call) of every mode, key length and payload size
+        p = self.program
+        for size in sizes:
+            message = os.urandom(size)
+            text = message.hex()[:size] # a text message of the same length
+            for keyLength in self.keyLengths:
+                key = os.urandom(keyLength)
+                IV = os.urandom(16)
+                nonce = os.urandom(12)
+                bits = keyLength * 8
+                # inputs of decryption are made once, by the warm-up call (outside of the measured calls),
+                # so the inputs of skipped cases are never made
+                inputs = {}
+                def Input(name, make):
+                    if name not in inputs: inputs[name] = make()
+                    return inputs[name]
+                def DecryptGCM():
+                    cryptogram, tag = Input('GCM', lambda: p.EncryptBytesAES_GCM(message, key, nonce))
+                    return p.DecryptBytesAES_GCM(cryptogram, key, nonce, tag)
+                functions = {
+                    'ECB-encrypt': lambda: p.EncryptBytesAES_ECB(message, key),
+                    'ECB-decrypt': lambda: p.DecryptBytesAES_ECB(Input('ECB', lambda: p.EncryptBytesAES_ECB(message, key)), key),
+                    'CBC-encrypt': lambda: p.EncryptBytesAES_CBC(message, key, IV),
+                    'CBC-decrypt': lambda: p.DecryptBytesAES_CBC(Input('CBC', lambda: p.EncryptBytesAES_CBC(message, key, IV)), key, IV),
+                    'CTR-encrypt': lambda: p.CryptBytesAES_CTR(message, key, IV),
+                    'CTR-decrypt': lambda: p.CryptBytesAES_CTR(message, key, IV),
+                    'GCM-encrypt': lambda: p.EncryptBytesAES_GCM(message, key, nonce),
+                    'GCM-decrypt': DecryptGCM,
+                }
+                for operation in self.modeOperations:
+                    yield "mode/{}/{}/{}".format(operation, bits, size), functions[operation], size
+                # the original text interface
+                functions = {
+                    'ECB-encrypt': lambda: p.EncryptAES_ECB(text, key),
+                    'ECB-decrypt': lambda: p.DecryptAES_ECB(Input('text ECB', lambda: p.EncryptAES_ECB(text, key)), key),
+                    'CBC-encrypt': lambda: p.EncryptAES_CBC(text, key, IV),
+                    'CBC-decrypt': lambda: p.DecryptAES_CBC(Input('text CBC', lambda: p.EncryptAES_CBC(text, key, IV)), key, IV),
+                }
+                for operation in self.textOperations:
+                    yield "text/{}/{}/{}".format(operation, bits, size), functions[operation], size
+
+    def Run(self, sizes, only = None, log = None):
+        results = {}
+        skipped = {} # name -> estimated seconds per call
+        throughput = {} # case name without the size -> MB/s at the largest size measured so far
+        # cases are measured as soon as they are generated - their functions use
+        # the payload and key of the current loop iteration of the generator
+        for name, function, byteCount in itertools.chain(self.PrimitiveCases(), self.ModeCases(sorted(sizes))):
+            if only is not None and only not in name: continue
+            family = name.rsplit('/', 1)[0]
+            if byteCount and throughput.get(family):
+                callTime = byteCount / (throughput[family] * 1e6)
+                if self.maxCaseTime and callTime * self.CallsPerCase() > self.maxCaseTime:
+                    skipped[name] = callTime
+                    if log is not None: log(name, {"skipped": callTime})
+                    continue
+            results[name] = self.Measure(function, byteCount)
+            throughput[family] = results[name]["MBps"]
+            if log is not None: log(name, results[name])
+        return {"meta": self.Meta(), "results": results, "skipped": skipped}
+
+    def CallsPerCase(self):
+        # the warm-up call, the measured ones and the call under tracemalloc (counted twice, tracing is slow)
+        return 1 + self.minCalls + (2 if self.measureMemory else 0)
+
+    def Meta(self):
+        # where the results come from, so that results of different machines are not mixed up
+        return {
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": AES_Program.numpy.__version__ if AES_Program.numpy is not None else None,
+        }
+
+    def Compare(self, baseline, current, threshold = 0.1):
+        # cases where current is slower than baseline by more than threshold (a fraction):
+        # lower throughput, or higher median latency for cases that process no data
+        regressions = []
+        for name, result in current["results"].items():
+            reference = baseline["results"].get(name)
+            if reference is None: continue
+            if result["MBps"] is not None and reference["MBps"] is not None:
+                change = result["MBps"] / reference["MBps"] - 1
+                if change < -threshold:
+                    regressions.append((name, "MBps", reference["MBps"], result["MBps"], change))
+            elif result["p50"] > reference["p50"] * (1 + threshold):
+                regressions.append((name, "p50", reference["p50"], result["p50"], result["p50"] / reference["p50"] - 1))
+        return regressions
+
+def PrintResult(name, result):
+    if "skipped" in result:
+        print("{:<60} skipped: about {:.0f} s per call".format(name, result["skipped"]), flush = True)
+        return
+    throughput = "{:10.3f} MB/s".format(result["MBps"]) if result["MBps"] is not None else " " * 15
+    memory = " peak {:>10} B".format(result["peakMemory"]) if "peakMemory" in result else ""
+    print("{:<60} {} p50 {:10.3f} ms p99 {:10.3f} ms{}".format(name, throughput, result["p50"] * 1e3, result["p99"] * 1e3, memory), flush = True)
+
+def Main(argv = None):
+    parser = argparse.ArgumentParser(description = "AES_Program benchmarks")
+    commands = parser.add_subparsers(dest = 'command', required = True)
+    run = commands.add_parser('run', help = "measure and write results as JSON")
+    run.add_argument('--preset', choices = sorted(AES_Benchmark.presets), default = 'default', help = "payload sizes to measure")
+    run.add_argument('--sizes', type = int, nargs = '+', help = "payload sizes in bytes (instead of --preset)")
+    run.add_argument('--only', help = "measure only cases whose name contains this text")
+    run.add_argument('--min-time', type = float, default = 0.5, help = "seconds spent measuring each case")
+    run.add_argument('--no-memory', action = 'store_true', help = "skip peak memory measurement")
+    run.add_argument('--max-case-time', type = float, default = 60, help = "skip cases expected to take longer (seconds, 0 - no limit)")
+    run.add_argument('--output', help = "JSON file to write the results to")
+    compare = commands.add_parser('compare', help = "find regressions against a saved baseline")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type = float, default = 0.1, help = "allowed slowdown (fraction)")
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'run':
+        benchmark = AES_Benchmark(minTime = arguments.min_time, measureMemory = not arguments.no_memory, maxCaseTime = arguments.max_case_time)
+        sizes = arguments.sizes if arguments.sizes else AES_Benchmark.presets[arguments.preset]
+        results = benchmark.Run(sizes, arguments.only, PrintResult)
+        if arguments.output:
+            with open(arguments.output, 'w') as file:
+                json.dump(results, file, indent = 1, sort_keys = True)
+        return 0
+
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)
+    with open(arguments.current) as file:
+        current = json.load(file)
+    regressions = AES_Benchmark().Compare(baseline, current, arguments.threshold)
+    for name, metric, before, after, change in regressions:
+        print("REGRESSION {:<60} {} {:.6g} -> {:.6g} ({:+.1%})".format(name, metric, before, after, change))
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    for name in missing:
+        print("missing    {}".format(name))
+    print("{} cases compared, {} regressions".format(len(set(baseline["results"]) & set(current["results"])), len(regressions)))
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(Main())
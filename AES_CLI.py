@@ -0,0 +1,255 @@
+
+# command-line encryption and decryption of files, directory trees and stdin/stdout with AES_Program:
+#   python AES_CLI.py encrypt --mode CBC --key-file key.bin archive.tar            (writes archive.tar.aes)
+#   python AES_CLI.py decrypt --mode CBC --key-env AES_KEY archive.tar.aes        (writes archive.tar)
+#   python AES_CLI.py encrypt --key-env AES_KEY -r -j 4 backups/ -o encrypted/    (the whole tree, 4 processes)
+#   tar c data | python AES_CLI.py encrypt --key-file key.bin - > data.tar.aes
+# keys and IVs come from files (raw bytes or hex) or environment variables (hex). a file that could be
+# either (e.g. 32 hex digits: a raw 256-bit key or a 128-bit key in hex) needs --key-format raw or hex.
+# without --iv-file/--iv-env every cryptogram starts with its own random IV (nonce in CTR and GCM mode),
+# which decryption reads back from there. GCM cryptograms end with the 16 byte tag.
+# a fixed IV is not accepted for encryption in CTR and GCM mode: every message encrypted
+# under the same key and nonce would reveal the xor of the messages (and in GCM the hash key)
+# files are processed in chunks, so they can be larger than memory
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import AES_Program
+
+class AES_CLI:
+    modes = ['ECB', 'CBC', 'CTR', 'GCM']
+    ivLengths = {'ECB': 0, 'CBC': 16, 'CTR': 16, 'GCM': 12}
+    suffix = '.aes' # added to the names of encrypted files, removed from the names of decrypted ones
+
+    def __init__(self, operation, mode, key, IV = None, chunkLength = 1 << 20):
+        self.operation = operation # 'encrypt' or 'decrypt'
+        self.mode = mode
+        self.key = key
+        self.IV = IV # None - a random IV stored in front of each cryptogram
+        if chunkLength < 16:
+            # read(0) would look like the end of the input
+            raise ValueError("Chunk length must be at least 16 bytes")
+        self.chunkLength = chunkLength
+        self.program = AES_Program.AES_Program()
+
+    def CryptStream(self, source, target):
+        # encrypt or decrypt everything read from source (binary file) into target, returns bytes read
+        if self.operation == 'encrypt':
+            return self.EncryptStream(source, target)
+        return self.DecryptStream(source, target)
+
+    def EncryptStream(self, source, target):
+        IV = self.IV
+        if IV is None and self.mode != 'ECB':
+            IV = os.urandom(self.ivLengths[self.mode])
+            target.write(IV)
+        encryptor = self.program.NewEncryptor(self.mode, self.key, IV)
+        length = 0
+        while True:
+            chunk = source.read(self.chunkLength)
+            if not chunk: break
+            length += len(chunk)
+            target.write(encryptor.update(chunk))
+        target.write(encryptor.finalize())
+        if self.mode == 'GCM': target.write(encryptor.tag)
+        return length
+
+    def DecryptStream(self, source, target):
+        IV = self.IV
+        length = 0
+        if IV is None and self.mode != 'ECB':
+            IV = source.read(self.ivLengths[self.mode])
+            length += len(IV)
+            if len(IV) != self.ivLengths[self.mode]:
+                raise ValueError("Cryptogram too short: no IV in front of it")
+        decryptor = self.program.NewDecryptor(self.mode, self.key, IV)
+        # GCM: the last bytes read may be the tag, so they are held back until the next chunk
+        tagLength = AES_Program.AESGCMEncryptor.tagLength if self.mode == 'GCM' else 0
+        held = b''
+        while True:
+            chunk = source.read(self.chunkLength)
+            if not chunk: break
+            length += len(chunk)
+            chunk = held + chunk
+            held = chunk[max(0, len(chunk) - tagLength):]
+            target.write(decryptor.update(chunk[:len(chunk) - tagLength]))
+        if self.mode == 'GCM':
+            if len(held) != tagLength:
+                raise ValueError("Cryptogram too short: no tag at its end")
+            target.write(decryptor.finalize(held))
+        else:
+            target.write(decryptor.finalize())
+        return length
+
+    def CryptFile(self, inputPath, outputPath):
+        # returns (bytes read, seconds), the output file is removed if decryption fails
+        if os.path.exists(outputPath) and os.path.samefile(inputPath, outputPath):
+            # opening the output would truncate the input before it is read
+            raise ValueError("Output {} is the input file".format(outputPath))
+        outputDirectory = os.path.dirname(outputPath)
+        if outputDirectory: os.makedirs(outputDirectory, exist_ok = True)
+        start = time.perf_counter()
+        try:
+            with open(inputPath, 'rb') as source, open(outputPath, 'wb') as target:
+                length = self.CryptStream(source, target)
+        except Exception:
+            if os.path.exists(outputPath): os.remove(outputPath)
+            raise
+        return length, time.perf_counter() - start
+
+    def OutputName(self, name):
+        if self.operation == 'encrypt': return name + self.suffix
+        if name.endswith(self.suffix) and len(name) > len(self.suffix): return name[:-len(self.suffix)]
+        return name + '.decrypted'
+
+    def Jobs(self, inputs, output, recursive):
+        # (input path, output path) of every file to process
+        jobs = []
+        for inputPath in inputs:
+            if os.path.isdir(inputPath):
+                if not recursive:
+                    raise ValueError("{} is a directory (use -r)".format(inputPath))
+                # the tree is recreated in output (or next to the input files without it)
+                for directory, subdirectories, files in os.walk(inputPath):
+                    subdirectories.sort()
+                    for name in sorted(files):
+                        path = os.path.join(directory, name)
+                        relative = os.path.relpath(directory, inputPath)
+                        outputDirectory = directory if output is None else os.path.normpath(os.path.join(output, relative))
+                        jobs.append((path, os.path.join(outputDirectory, self.OutputName(name))))
+            elif output is not None and (len(inputs) > 1 or os.path.isdir(output)):
+                jobs.append((inputPath, os.path.join(output, self.OutputName(os.path.basename(inputPath)))))
+            else:
+                jobs.append((inputPath, output if output is not None else os.path.join(os.path.dirname(inputPath), self.OutputName(os.path.basename(inputPath)))))
+        return jobs
+
+def RunJobs(cli, jobs, workers):
+    # (input path, (bytes, seconds) or the exception that stopped it) of every job, in the order of jobs
+    if workers <= 1 or len(jobs) <= 1:
+        for inputPath, outputPath in jobs:
+            try:
+                yield inputPath, cli.CryptFile(inputPath, outputPath)
+            except (OSError, ValueError) as exception:
+                yield inputPath, exception
+        return
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = [(inputPath, executor.submit(cli.CryptFile, inputPath, outputPath)) for inputPath, outputPath in jobs]
+        for inputPath, future in futures:
+            try:
+                yield inputPath, future.result()
+            except (OSError, ValueError) as exception:
+                yield inputPath, exception
+
+def ReadSecret(path, variable, name, lengths, fileFormat = 'auto'):
+    # key or IV from a file (raw bytes, or hex text) or from an environment variable (hex).
+    # fileFormat 'auto' - hex if the file holds hex of a valid length, raw bytes otherwise
+    # (ValueError if it is valid both ways), 'raw' or 'hex' - the file is read that way
+    if path is not None:
+        with open(path, 'rb') as file:
+            value = file.read()
+        try:
+            hexValue = bytes.fromhex(value.decode('ascii').strip())
+        except ValueError:
+            hexValue = None # not hex - raw bytes
+        if fileFormat == 'auto':
+            hexFits = hexValue is not None and len(hexValue) in lengths
+            if hexFits and len(value) in lengths:
+                raise ValueError("{} file {} is {} raw bytes or {} bytes in hex (use --key-format raw or hex)".format(name, path, len(value), len(hexValue)))
+            fileFormat = 'hex' if hexFits else 'raw'
+        if fileFormat == 'hex':
+            if hexValue is None:
+                raise ValueError("{} file {} does not hold hex".format(name, path))
+            value = hexValue
+    elif variable is not None:
+        if variable not in os.environ:
+            raise ValueError("Environment variable {} is not set".format(variable))
+        try:
+            value = bytes.fromhex(os.environ[variable].strip())
+        except ValueError:
+            raise ValueError("Environment variable {} does not hold a hex {}".format(variable, name))
+    else:
+        return None
+    if len(value) not in lengths:
+        raise ValueError("{} of unsupported length: {} bytes (expected {})".format(name, len(value), " or ".join(str(length) for length in lengths)))
+    return value
+
+def ChunkSize(text):
+    # --chunk-size: at least a block (a GCM tag must fit into the bytes held back between chunks)
+    size = int(text)
+    if size < 16:
+        raise argparse.ArgumentTypeError("chunk size must be at least 16 bytes")
+    return size
+
+def PrintThroughput(name, length, seconds):
+    rate = length / seconds / 1e6 if seconds > 0 else 0.0
+    print("{}: {} bytes in {:.3f} s ({:.2f} MB/s)".format(name, length, seconds, rate), file = sys.stderr, flush = True)
+
+def Main(argv = None):
+    parser = argparse.ArgumentParser(description = "AES encryption and decryption of files, directories and stdin/stdout")
+    parser.add_argument('operation', choices = ['encrypt', 'decrypt'])
+    parser.add_argument('inputs', nargs = '*', default = ['-'], help = "files or directories (- or nothing: stdin)")
+    parser.add_argument('-o', '--output', help = "output file, or directory for several inputs (- : stdout)")
+    parser.add_argument('-m', '--mode', choices = AES_CLI.modes, default = 'CBC')
+    keys = parser.add_mutually_exclusive_group(required = True)
+    keys.add_argument('--key-file', help = "file holding the key (16, 24 or 32 bytes, raw or hex)")
+    keys.add_argument('--key-env', help = "environment variable holding the key in hex")
+    IVs = parser.add_mutually_exclusive_group()
+    IVs.add_argument('--iv-file', help = "file holding the IV (raw or hex); default: a random IV stored with each cryptogram")
+    IVs.add_argument('--iv-env', help = "environment variable holding the IV in hex")
+    parser.add_argument('--legacy-key-schedule', action = 'store_true',
+                        help = "expand 256-bit keys like versions before CTR mode (to decrypt data they encrypted)")
+    parser.add_argument('--key-format', choices = ['auto', 'raw', 'hex'], default = 'auto',
+                        help = "how --key-file and --iv-file are read (auto: hex if they hold hex of a valid length)")
+    parser.add_argument('-r', '--recursive', action = 'store_true', help = "process directories and everything in them")
+    parser.add_argument('-j', '--jobs', type = int, default = 1, help = "files processed at once by worker processes")
+    parser.add_argument('-c', '--chunk-size', type = ChunkSize, default = 1 << 20, help = "bytes read at once (at least 16)")
+    parser.add_argument('-q', '--quiet', action = 'store_true', help = "do not print throughput")
+    # options may come between the inputs
+    arguments = parser.parse_intermixed_args(argv)
+
+    try:
+        key = ReadSecret(arguments.key_file, arguments.key_env, "Key", [16, 24, 32], arguments.key_format)
+        if arguments.legacy_key_schedule: key = AES_Program.AESKeySchedule(key, legacy = True)
+        IV = None
+        if arguments.mode != 'ECB':
+            IV = ReadSecret(arguments.iv_file, arguments.iv_env, "IV", [AES_CLI.ivLengths[arguments.mode]], arguments.key_format)
+            if IV is not None and arguments.operation == 'encrypt' and arguments.mode in ('CTR', 'GCM'):
+                raise ValueError("A fixed IV would reuse the nonce in {} mode; leave out --iv-file/--iv-env for a random one".format(arguments.mode))
+        cli = AES_CLI(arguments.operation, arguments.mode, key, IV, arguments.chunk_size)
+        if arguments.inputs == ['-']:
+            # a single stream: stdin to the output file or stdout
+            start = time.perf_counter()
+            if arguments.output is None or arguments.output == '-':
+                length = cli.CryptStream(sys.stdin.buffer, sys.stdout.buffer)
+                sys.stdout.buffer.flush()
+            else:
+                with open(arguments.output, 'wb') as target:
+                    length = cli.CryptStream(sys.stdin.buffer, target)
+            if not arguments.quiet: PrintThroughput("<stdin>", length, time.perf_counter() - start)
+            return 0
+        jobs = cli.Jobs(arguments.inputs, arguments.output, arguments.recursive)
+    except (OSError, ValueError) as exception:
+        print("error: {}".format(exception), file = sys.stderr)
+        return 1
+
+    failures = 0
+    total = 0
+    start = time.perf_counter()
+    for inputPath, result in RunJobs(cli, jobs, arguments.jobs):
+        if isinstance(result, Exception):
+            print("error: {}: {}".format(inputPath, result), file = sys.stderr)
+            failures += 1
+            continue
+        length, seconds = result
+        total += length
+        if not arguments.quiet: PrintThroughput(inputPath, length, seconds)
+    if not arguments.quiet:
+        PrintThroughput("total ({} files, {} failed)".format(len(jobs), failures), total, time.perf_counter() - start)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(Main())
@@ -0,0 +1,217 @@
+
+# containers of independently encrypted chunks (AES_Program.EncryptContainer and DecryptContainer)
+
+import os
+import struct
+import threading
+import zlib
+
+from .AES_Core import AES_Program, AESGCMEncryptor
+
+class AESContainer:
+    # file format of independently encrypted chunks, which can be written and read in any order:
+    #   header: "AESC", version, mode, key length, chunkLength (message bytes in every chunk but the last),
+    #     key check value (the start of a fixed block encrypted with the key - a wrong key is told at once)
+    #   chunk records: IV | cryptogram | GCM tag (GCM only) | CRC-32 of everything before it in the record
+    #     all records but the last one have the same length, so record i starts at header length + i * RecordLength();
+    #     each chunk has its own random IV, only the last one is padded (CBC)
+    #   index: (offset, length) of every record, then the number of records, the offset of the index and "AESI".
+    # the CRC tells complete records from ones cut off when writing was interrupted.
+    # GCM authenticates the header, the chunk index and whether it is the last chunk with every chunk
+    # (as associated data), so records can't be swapped, moved or dropped from the end unnoticed.
+    # version 1 (no associated data) and version 2 containers (no key check value) can still be read
+
+    magic = b'AESC'
+    indexMagic = b'AESI'
+    version = 3
+    header = struct.Struct('>4sBBBxI')
+    keyCheck = struct.Struct('>8s') # after the header since version 3
+    keyCheckBlock = b'AESC key check\0\0'
+    chunkPosition = struct.Struct('>QB') # chunk index and last flag, in the associated data
+    indexEntry = struct.Struct('>QI')
+    trailer = struct.Struct('>QQ4s')
+    checksum = struct.Struct('>I')
+    modes = ['CBC', 'CTR', 'GCM'] # stored as the position in this list
+    ivLengths = {'CBC': 16, 'CTR': 16, 'GCM': 12}
+
+    def RecordLength(self, mode, chunkLength):
+        # length of the record of a chunk that is not the last one
+        return self.ivLengths[mode] + chunkLength + (AESGCMEncryptor.tagLength if mode == 'GCM' else 0) + self.checksum.size
+
+    def KeyCheck(self, key):
+        return self.keyCheck.pack(bytes(self.program.EncryptBytesAES_ECB(self.keyCheckBlock, key, padding = False)[:self.keyCheck.size]))
+
+    def AssociatedData(self, index, last):
+        # associated data of chunk index in GCM mode
+        if self.headerVersion == 1: return b''
+        return self.headerBytes + self.chunkPosition.pack(index, last)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Close()
+
+class AESContainerWriter(AESContainer):
+    # writes the chunk records of a container at their places (from any thread, in any order),
+    # Close() writes the index. resume = True reopens an incomplete container made with the same
+    # key and settings (ValueError otherwise): chunkCount is then the number of complete chunks at its start,
+    # writing continues from there.
+    # a last chunk of exactly chunkLength bytes looks like any complete chunk, so it may be
+    # counted too - the last chunk has to be written again anyway, Close() writes the index only after that
+
+    def __init__(self, path, key, mode = 'CBC', chunkLength = 1 << 20, resume = False, program = None):
+        self.program = program if program is not None else AES_Program()
+        if mode not in self.modes:
+            raise ValueError("Unsupported container mode: {}".format(mode))
+        if chunkLength <= 0 or chunkLength % AES_Program.bytesPerBlock != 0:
+            raise ValueError("Chunk length must be a positive multiple of block size")
+        self.key = key
+        self.mode = mode
+        self.keyLength = len(key)
+        self.chunkLength = chunkLength
+        self.recordLength = self.RecordLength(mode, chunkLength)
+        self.headerVersion = self.version
+        self.headerBytes = self.header.pack(self.magic, self.version, self.modes.index(mode), self.keyLength, chunkLength) + self.KeyCheck(key)
+        self.headerLength = len(self.headerBytes)
+        self.lock = threading.Lock()
+        self.lastChunk = None # (index, record length) of the last chunk, once it is written
+        self.chunkCount = 0
+        if resume and os.path.exists(path):
+            self.file = open(path, 'r+b')
+            self.chunkCount = self.CompleteChunks()
+            # anything after the complete chunks (a cut off record, a last chunk, an index) is written again
+            self.file.truncate(self.headerLength + self.chunkCount * self.recordLength)
+        else:
+            self.file = open(path, 'w+b')
+            self.file.write(self.headerBytes)
+            self.file.flush()
+
+    def CompleteChunks(self):
+        # number of complete chunk records from the start of the container
+        header = os.pread(self.file.fileno(), self.headerLength, 0)
+        if header[:self.header.size] != self.headerBytes[:self.header.size]:
+            raise ValueError("Can't resume: the container has a different version, mode, key length or chunk length")
+        if header != self.headerBytes:
+            raise ValueError("Can't resume: the container was encrypted with another key")
+        count = 0
+        while True:
+            record = os.pread(self.file.fileno(), self.recordLength, self.headerLength + count * self.recordLength)
+            if len(record) != self.recordLength or not self.ValidRecord(record): return count
+            count += 1
+
+    def ValidRecord(self, record):
+        return zlib.crc32(record[:-self.checksum.size]) == self.checksum.unpack(record[-self.checksum.size:])[0]
+
+    def WriteRecord(self, index, record, last = False):
+        # record made by AESContainerChunk from message bytes index * chunkLength... (the whole rest if last)
+        if not last and len(record) != self.recordLength:
+            raise ValueError("Only the last chunk can be shorter than chunkLength")
+        os.pwrite(self.file.fileno(), record, self.headerLength + index * self.recordLength)
+        if last:
+            with self.lock:
+                self.lastChunk = (index, len(record))
+
+    def WriteChunk(self, index, data, last = False):
+        # encrypt message bytes index * chunkLength... (all the rest if last) and write them
+        self.WriteRecord(index, AESContainerChunk(self.key, self.mode, data, last, False, self.AssociatedData(index, last)), last)
+
+    def Close(self):
+        if self.file is None: return
+        try:
+            if self.lastChunk is not None:
+                # the index - written only when the container is complete
+                count = self.lastChunk[0] + 1
+                index = b''.join(self.indexEntry.pack(self.headerLength + i * self.recordLength, self.recordLength) for i in range(count - 1))
+                index += self.indexEntry.pack(self.headerLength + (count - 1) * self.recordLength, self.lastChunk[1])
+                indexOffset = self.headerLength + (count - 1) * self.recordLength + self.lastChunk[1]
+                os.pwrite(self.file.fileno(), index + self.trailer.pack(count, indexOffset, self.indexMagic), indexOffset)
+                self.file.truncate(indexOffset + len(index) + self.trailer.size)
+        finally:
+            self.file.close()
+            self.file = None
+
+class AESContainerReader(AESContainer):
+    # random access to the chunks of a complete container
+
+    def __init__(self, path, key, program = None):
+        self.program = program if program is not None else AES_Program()
+        self.key = key
+        self.file = open(path, 'rb')
+        try:
+            self.headerBytes = self.file.read(self.header.size)
+            if len(self.headerBytes) != self.header.size:
+                raise ValueError("Not a container (or a container of an unknown version)")
+            magic, self.headerVersion, mode, keyLength, self.chunkLength = self.header.unpack(self.headerBytes)
+            if magic != self.magic or self.headerVersion not in (1, 2, self.version) or mode >= len(self.modes):
+                raise ValueError("Not a container (or a container of an unknown version)")
+            if keyLength != len(key):
+                raise ValueError("The container was encrypted with a {} byte key".format(keyLength))
+            if self.headerVersion >= 3:
+                self.headerBytes += self.file.read(self.keyCheck.size)
+                if self.headerBytes[self.header.size:] != self.KeyCheck(key):
+                    raise ValueError("Wrong key: the container was encrypted with another key")
+            self.headerLength = len(self.headerBytes)
+            self.mode = self.modes[mode]
+            size = os.fstat(self.file.fileno()).st_size
+            if size < self.headerLength + self.trailer.size:
+                raise ValueError("Incomplete container: no index")
+            self.chunkCount, indexOffset, magic = self.trailer.unpack(os.pread(self.file.fileno(), self.trailer.size, size - self.trailer.size))
+            if magic != self.indexMagic or indexOffset + self.chunkCount * self.indexEntry.size + self.trailer.size != size:
+                raise ValueError("Incomplete container: no index")
+            index = os.pread(self.file.fileno(), self.chunkCount * self.indexEntry.size, indexOffset)
+            self.records = [self.indexEntry.unpack_from(index, i * self.indexEntry.size) for i in range(self.chunkCount)]
+        except Exception:
+            self.file.close()
+            raise
+
+    def ReadRecord(self, index):
+        offset, length = self.records[index]
+        return os.pread(self.file.fileno(), length, offset)
+
+    def ReadChunk(self, index):
+        # message bytes of chunk index (ValueError if its record is damaged)
+        last = index == self.chunkCount - 1
+        return AESContainerChunk(self.key, self.mode, self.ReadRecord(index), last, True, self.AssociatedData(index, last))
+
+    def Read(self, start, length):
+        # message bytes start:start + length, decrypting only the chunks that hold them
+        result = bytearray()
+        for index in range(start // self.chunkLength, min(self.chunkCount, -(-(start + length) // self.chunkLength))):
+            chunk = self.ReadChunk(index)
+            chunkStart = index * self.chunkLength
+            result += chunk[max(0, start - chunkStart):max(0, start + length - chunkStart)]
+        return bytes(result)
+
+    def Close(self):
+        self.file.close()
+
+def AESContainerChunk(key, mode, data, last, decrypt, associatedData = b''):
+    # the record of one chunk of a container (decrypt = False), or the message of a record (decrypt = True).
+    # associatedData (GCM) is AESContainer.AssociatedData of the chunk.
+    # a module function, so that worker processes can run it
+    program = AES_Program()
+    checksum = AESContainer.checksum
+    ivLength = AESContainer.ivLengths[mode]
+    if not decrypt:
+        IV = os.urandom(ivLength)
+        if mode == 'CBC':
+            cryptogram = program.EncryptBytesAES_CBC(data, key, IV, padding = last)
+        elif mode == 'CTR':
+            cryptogram = program.CryptBytesAES_CTR(data, key, IV)
+        else:
+            cryptogram, tag = program.EncryptBytesAES_GCM(data, key, IV, associatedData)
+            cryptogram += tag
+        record = IV + bytes(cryptogram)
+        return record + checksum.pack(zlib.crc32(record))
+    record = memoryview(data)
+    if len(record) < ivLength + checksum.size or zlib.crc32(record[:-checksum.size]) != checksum.unpack(record[-checksum.size:])[0]:
+        raise ValueError("Damaged chunk record")
+    IV = bytes(record[:ivLength])
+    cryptogram = record[ivLength:-checksum.size]
+    if mode == 'CBC':
+        return bytes(program.DecryptBytesAES_CBC(cryptogram, key, IV, padding = last))
+    if mode == 'CTR':
+        return bytes(program.CryptBytesAES_CTR(cryptogram, key, IV))
+    tagLength = AESGCMEncryptor.tagLength
+    return bytes(program.DecryptBytesAES_GCM(cryptogram[:-tagLength], key, IV, cryptogram[-tagLength:], associatedData))
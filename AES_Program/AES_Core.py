@@ -0,0 +1,3225 @@
+
+# the cipher (AES, AESTTable and the batch engines), its modes (AES_Program) and everything they need at once.
+# importing this module computes no tables and starts nothing; numpy, process pools, asyncio streams
+# and containers are only imported when they are first used
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import bisect
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from . import AES_Tables
+
+numpy = None # the vectorized engine (AESNumpy) is only used when numpy is installed (see LoadNumpy)
+numpyChecked = False # whether LoadNumpy tried to import numpy
+
+def LoadNumpy():
+    # numpy, imported the first time it could be used (None when it is not installed) -
+    # importing numpy takes longer than importing all of this package
+    global numpy, numpyChecked
+    if not numpyChecked:
+        try:
+            import numpy
+        except ImportError:
+            pass
+        numpyChecked = True
+    return numpy
+
+class AES_Program:
+    blockLength : int = 128 # how many bits AES processes at once
+    bitsPerByte : int = 8 # how many bits are used to encode a char
+    bytesPerBlock = blockLength // bitsPerByte # how many bytes are in a block
+    encoding = 'utf-8' # encoding used for strings
+    useNumpy = True # process independent blocks all at once with AESNumpy (when numpy is installed)
+    numpyMinBlocks = 32 # below this many blocks the per-block engine is faster than numpy
+    useBitslice = True # without numpy, process independent blocks in bitsliced batches with AESBitslice
+    bitsliceMinBlocks = 128 # below this many blocks the per-block engine is faster than bitslicing
+
+    ctrWindowBlocks = 1 << 16 # blocks of keystream generated at once in CTR mode
+    parallelWorkers = 0 # worker processes used for large payloads (0 - everything runs in this process, None - one per CPU)
+    parallelThreshold = 1 << 20 # payloads shorter than this many bytes are always processed serially
+    batchWorkers = None # threads used by EncryptBatch and DecryptBatch (0 - no threads, None - one per CPU)
+    streamChunkLength = 1 << 16 # EncryptStream and DecryptStream read their input in chunks of at most this many bytes
+    streamMaxInFlight = 1 << 20 # most bytes read by a stream and not written yet
+    streamOffloadLength = 1 << 12 # stream chunks of at least this many bytes are processed on threadPool, not on the event loop
+    fileWindowLength = 1 << 24 # bytes of a file mapped into memory at once by EncryptFileAES and DecryptFileAES
+    containerChunkLength = 1 << 20 # message bytes in each chunk of a container (EncryptContainer)
+    xtsBatchLength = 1 << 20 # bytes of sectors processed together in XTS mode
+
+    def UseNumpy(self, blockCount):
+        return self.useNumpy and blockCount >= self.numpyMinBlocks and LoadNumpy() is not None
+
+    def UseBitslice(self, blockCount):
+        return self.useBitslice and blockCount >= self.bitsliceMinBlocks
+
+    def NewEncryptor(self, mode, key, IV = None, associatedData = b''):
+        # incremental encryption: call update() with pieces of the message, then finalize()
+        # (IV is the nonce in CTR mode, associatedData is only used in GCM mode, where the tag is in .tag after finalize())
+        if mode == 'CTR': return AESCTRCryptor(key, IV, 0, self)
+        if mode == 'GCM': return AESGCMEncryptor(key, IV, associatedData, self)
+        return AESEncryptor(mode, key, IV, self)
+
+    def NewDecryptor(self, mode, key, IV = None, associatedData = b'', tag = None):
+        # incremental decryption: call update() with pieces of the cryptogram, then finalize()
+        if mode == 'CTR': return AESCTRCryptor(key, IV, 0, self)
+        if mode == 'GCM': return AESGCMDecryptor(key, IV, associatedData, tag, self)
+        return AESDecryptor(mode, key, IV, self)
+
+    def NewStream(self, cryptor):
+        # asyncio driver of an encryptor or decryptor made by NewEncryptor or NewDecryptor
+        from .AES_Stream import AESStream
+        return AESStream(cryptor, self.streamChunkLength, self.streamMaxInFlight, self.streamOffloadLength, self)
+
+    async def EncryptStream(self, source, writer, key, mode, IV = None, associatedData = b''):
+        # asyncio counterpart of the mode functions: encrypts everything read from source
+        # (an asyncio.StreamReader or an async iterator of bytes-like chunks) and writes the cryptogram
+        # to writer (an asyncio.StreamWriter), piece by piece. returns the tag in GCM mode, None otherwise
+        encryptor = self.NewEncryptor(mode, key, IV, associatedData)
+        await self.NewStream(encryptor).Pipe(source, writer)
+        return encryptor.tag if mode == 'GCM' else None
+
+    async def DecryptStream(self, source, writer, key, mode, IV = None, tag = None, associatedData = b''):
+        # reverse of EncryptStream. the padding (ECB, CBC) and the tag (GCM) are only checked at the end,
+        # when most of the message has already been written - ValueError is raised if they are wrong
+        await self.NewStream(self.NewDecryptor(mode, key, IV, associatedData, tag)).Pipe(source, writer)
+
+    def NewCipher(self, key):
+        # immutable cipher context of one key, safe to share between threads
+        return AESCipher(key, self)
+
+    def EncryptBatch(self, messages, keys, mode, IVs = None):
+        # encrypt many independent messages (bytes-like) concurrently on the threads of threadPool.
+        # keys is one key for all messages or a list with one key per message,
+        # IVs a list with one IV (CBC, GCM) or nonce (CTR) per message.
+        # returns a list of cryptograms ((cryptogram, tag) pairs in GCM mode)
+        operations = {
+            'ECB': lambda cipher, message, IV, tag: cipher.EncryptECB(message),
+            'CBC': lambda cipher, message, IV, tag: cipher.EncryptCBC(message, IV),
+            'CTR': lambda cipher, message, IV, tag: cipher.CryptCTR(message, IV),
+            'GCM': lambda cipher, message, IV, tag: cipher.EncryptGCM(message, IV),
+        }
+        if mode == 'CBC':
+            # chaining makes the blocks of one message serial, but different messages can be encrypted side by side
+            messages = list(messages)
+            if self.UseNumpy(len(messages)) or self.UseBitslice(len(messages)): return self.EncryptLanesAES_CBC(messages, keys, IVs)
+        return self.RunBatch(operations, messages, keys, mode, IVs, None)
+
+    def EncryptLanesAES_CBC(self, messages, keys, IVs, padding = True):
+        # CBC encryption of many independent messages (bytes-like) as lanes: block i of every message
+        # is encrypted together with block i of all the others (AESNumpy.AESEncryptLanesCBC; without numpy
+        # AESBitslice.AESEncryptLanesCBC, when there are at least bitsliceMinBlocks messages),
+        # so a batch takes as many steps as its longest message has blocks, however many messages it has.
+        # keys is one key for all messages or a list with one key per message, IVs a list with one IV per message.
+        # returns a list of cryptograms (bytearrays)
+        messages = [memoryview(message).cast('B') for message in messages]
+        if isinstance(keys, (list, tuple)):
+            if len(keys) != len(messages): raise ValueError("Expected one key per message")
+        else:
+            keys = [keys] * len(messages)
+        if IVs is None or len(IVs) != len(messages):
+            raise ValueError("CBC mode needs one IV per message")
+        for IV in IVs:
+            if len(IV) != self.bytesPerBlock: raise ValueError("CBC mode needs an IV of {} bytes".format(self.bytesPerBlock))
+        schedules = [keyScheduleCache.GetSchedule(key) for key in keys]
+        # the padded messages one after another in a single buffer, encrypted in place
+        starts = []
+        lengths = []
+        total = 0
+        for message in messages:
+            length = len(message)
+            if padding:
+                length = (length // self.bytesPerBlock + 1) * self.bytesPerBlock
+            elif length % self.bytesPerBlock != 0:
+                raise ValueError("Message length is not a multiple of block size (use padding)")
+            starts.append(total)
+            lengths.append(length)
+            total += length
+        buffer = bytearray(total)
+        for message, start, length in zip(messages, starts, lengths):
+            buffer[start:start + len(message)] = message
+            paddingLength = length - len(message)
+            buffer[start + len(message):start + length] = bytes([paddingLength]) * paddingLength
+        if self.useNumpy and LoadNumpy() is not None:
+            AESNumpy().AESEncryptLanesCBC(buffer, starts, lengths, schedules, IVs)
+        elif self.UseBitslice(len(messages)):
+            AESBitslice().AESEncryptLanesCBC(buffer, starts, lengths, schedules, IVs)
+        else:
+            view = memoryview(buffer)
+            for start, length, schedule, IV in zip(starts, lengths, schedules, IVs):
+                CryptBlocksInPlace(view[start:start + length], schedule, 'CBC-encrypt', IV, program = self)
+            view.release()
+        return [buffer[start:start + length] for start, length in zip(starts, lengths)]
+
+    def DecryptBatch(self, cryptograms, keys, mode, IVs = None, tags = None):
+        # reverse of EncryptBatch, tags is a list with the tag of each cryptogram in GCM mode
+        operations = {
+            'ECB': lambda cipher, cryptogram, IV, tag: cipher.DecryptECB(cryptogram),
+            'CBC': lambda cipher, cryptogram, IV, tag: cipher.DecryptCBC(cryptogram, IV),
+            'CTR': lambda cipher, cryptogram, IV, tag: cipher.CryptCTR(cryptogram, IV),
+            'GCM': lambda cipher, cryptogram, IV, tag: cipher.DecryptGCM(cryptogram, IV, tag),
+        }
+        return self.RunBatch(operations, cryptograms, keys, mode, IVs, tags)
+
+    def RunBatch(self, operations, inputs, keys, mode, IVs, tags):
+        if mode not in operations:
+            raise ValueError("Unsupported mode: {}".format(mode))
+        inputs = list(inputs)
+        if isinstance(keys, (list, tuple)):
+            if len(keys) != len(inputs): raise ValueError("Expected one key per message")
+        else:
+            keys = [keys] * len(inputs)
+        if mode != 'ECB' and (IVs is None or len(IVs) != len(inputs)):
+            raise ValueError("{} mode needs one IV per message".format(mode))
+        if mode == 'GCM' and tags is not None and len(tags) != len(inputs):
+            raise ValueError("Expected one tag per cryptogram")
+        # one context per distinct key (or key schedule), shared by all the messages encrypted with that key
+        keyIds = [key if isinstance(key, AESKeySchedule) else bytes(key) for key in keys]
+        ciphers = {}
+        for key, keyId in zip(keys, keyIds):
+            if keyId not in ciphers: ciphers[keyId] = self.NewCipher(key)
+        operation = operations[mode]
+        tasks = [(ciphers[keyIds[i]], inputs[i], IVs[i] if IVs is not None else None, tags[i] if tags is not None else None)
+                 for i in range(len(inputs))]
+        if self.batchWorkers == 0 or len(tasks) < 2:
+            return [operation(*task) for task in tasks]
+        from .AES_Pool import threadPool
+        executor = threadPool.GetExecutor(self.batchWorkers)
+        return list(executor.map(lambda task: operation(*task), tasks))
+
+    def UseParallel(self, byteCount):
+        return self.parallelWorkers != 0 and byteCount >= self.parallelThreshold
+
+    def ParallelCrypt(self, data, schedule, operation, IV = None):
+        # run operation ('ECB-encrypt', 'ECB-decrypt' or 'CBC-decrypt') on data
+        # split into chunks on the worker processes of processPool, returns bytes.
+        # data is copied once into shared memory and the workers work on it in place,
+        # only the chunk bounds, the key and (for CBC) one cryptogram block are sent to them
+        from .AES_Pool import AESProcessChunk, processPool
+        workers = processPool.Workers(self.parallelWorkers)
+        length = len(data)
+        # a few chunks per worker evens out differences in worker speed
+        chunkLength = -(-length // (4 * workers * self.bytesPerBlock)) * self.bytesPerBlock
+        sharedData = processPool.NewSharedMemory(length)
+        try:
+            sharedData.buf[:length] = data
+            futures = []
+            for start in range(0, length, chunkLength):
+                # CBC: the first block of a chunk is xored with the last cryptogram block of the previous one
+                previousBlock = None
+                if operation == 'CBC-decrypt':
+                    previousBlock = bytes(IV) if start == 0 else bytes(data[start - self.bytesPerBlock:start])
+                end = min(start + chunkLength, length)
+                futures.append(processPool.Submit(self.parallelWorkers, AESProcessChunk, sharedData.name, start, end, schedule.key, operation, previousBlock, schedule.legacy))
+            for future in futures:
+                future.result()
+            return bytes(sharedData.buf[:length])
+        finally:
+            processPool.RemoveSharedMemory(sharedData)
+
+    def EncryptAES_ECB(self, message, key):
+        # message should be a string of characters
+        # the padded message is put in a single buffer and encrypted there in place
+        # (blocks are independent - split between worker processes for large messages if they are enabled)
+        buffer = self.MessageToBuffer(message)
+        self.CryptBuffer(memoryview(buffer), keyScheduleCache.GetSchedule(key), 'ECB-encrypt')
+        return bytes(buffer)
+
+    def DecryptAES_ECB(self, cryptogram, key):
+        # the cryptogram is copied once and decrypted in place
+        buffer = bytearray(cryptogram)
+        self.CryptBuffer(memoryview(buffer), keyScheduleCache.GetSchedule(key), 'ECB-decrypt')
+        return self.BufferToMessage(buffer)
+
+    def EncryptAES_CBC(self, message, key, IV):   
+        # message should be a string of characters
+        # blocks are encrypted in series in place: every block is xored with the previous cryptogram block (IV for the first one)
+        buffer = self.MessageToBuffer(message)
+        self.CryptBuffer(memoryview(buffer), keyScheduleCache.GetSchedule(key), 'CBC-encrypt', IV)
+        return bytes(buffer)
+
+    def DecryptAES_CBC(self, cryptogram, key, IV):
+        # every block depends only on its own and the previous cryptogram block,
+        # so all blocks may be decrypted at once (or split between worker processes)
+        buffer = bytearray(cryptogram)
+        self.CryptBuffer(memoryview(buffer), keyScheduleCache.GetSchedule(key), 'CBC-decrypt', IV)
+        return self.BufferToMessage(buffer)
+
+    def EncryptAES_CTR(self, message, key, nonce):
+        # message should be a string of characters
+        # CTR needs no padding - the cryptogram is exactly as long as the message bytes
+        return bytes(self.CryptBytesAES_CTR(bytes(message, self.encoding), key, nonce))
+
+    def DecryptAES_CTR(self, cryptogram, key, nonce):
+        # decryption in CTR mode is the same operation as encryption
+        return bytes(self.CryptBytesAES_CTR(cryptogram, key, nonce)).decode(self.encoding, 'ignore')
+
+    def CryptBytesAES_CTR(self, data, key, nonce, offset = 0, out = None, counterBits = 128):
+        # encrypt or decrypt (the same operation) binary data in CTR mode:
+        # data is xored with the keystream - encrypted counter blocks, starting at
+        # the nonce (see KeystreamAES_CTR). offset is the position of data in the
+        # whole stream, so any part of a cryptogram can be decrypted on its own.
+        # out works like in EncryptBytes
+        schedule = keyScheduleCache.GetSchedule(key)
+        source = memoryview(data).cast('B')
+        length = len(source)
+        target, result = self.OutputBuffer(out, length)
+        # a window of the stream at a time, so the keystream never takes much memory
+        windowLength = self.ctrWindowBlocks * self.bytesPerBlock
+        for start in range(0, length, windowLength):
+            end = min(start + windowLength, length)
+            position = offset + start
+            firstBlock = position // self.bytesPerBlock
+            skip = position % self.bytesPerBlock # bytes of the first block that lie before the window
+            blockCount = -(-(skip + end - start) // self.bytesPerBlock)
+            keystream = self.KeystreamAES_CTR(schedule, nonce, firstBlock, blockCount, counterBits)
+            target[start:end] = xorBytes(source[start:end], memoryview(keystream)[skip:skip + end - start])
+        return result if result is not None else length
+
+    def KeystreamAES_CTR(self, key, nonce, firstBlock, blockCount, counterBits = 128):
+        # blockCount blocks of CTR keystream, starting with block firstBlock of the stream.
+        # counter block i is the nonce (a 16 byte initial counter block; a shorter nonce
+        # is followed by a counter starting at 0) plus i, as a 128-bit big-endian number.
+        # with counterBits only the lowest counterBits bits are incremented (GCM uses 32).
+        # the counter blocks are encrypted all at once, like a message in ECB mode
+        schedule = keyScheduleCache.GetSchedule(key)
+        if len(nonce) > self.bytesPerBlock:
+            raise ValueError("Nonce longer than a block")
+        initialCounter = int.from_bytes(bytes(nonce).ljust(self.bytesPerBlock, b'\0'), 'big')
+        counterLimit = 1 << counterBits
+        prefix = initialCounter - initialCounter % counterLimit # bits that never change
+        counter = initialCounter % counterLimit + firstBlock
+        keystream = bytearray(b''.join([(prefix | (counter + i) % counterLimit).to_bytes(16, 'big') for i in range(blockCount)]))
+        self.CryptBuffer(memoryview(keystream), schedule, 'ECB-encrypt')
+        return keystream
+
+    def EncryptAES_GCM(self, message, key, IV, associatedData = b''):
+        # message should be a string of characters
+        # returns the cryptogram followed by the 16 byte authentication tag
+        cryptogram, tag = self.EncryptBytesAES_GCM(bytes(message, self.encoding), key, IV, associatedData)
+        return bytes(cryptogram) + tag
+
+    def DecryptAES_GCM(self, cryptogram, key, IV, associatedData = b''):
+        # cryptogram is followed by the authentication tag (as returned by EncryptAES_GCM),
+        # ValueError is raised if the cryptogram or associatedData were changed
+        tagLength = AESGCMEncryptor.tagLength
+        message = self.DecryptBytesAES_GCM(cryptogram[:-tagLength], key, IV, cryptogram[-tagLength:], associatedData)
+        return bytes(message).decode(self.encoding, 'ignore')
+
+    def EncryptBytesAES_GCM(self, data, key, IV, associatedData = b'', out = None):
+        # authenticated encryption of binary data, returns (cryptogram, tag).
+        # associatedData is authenticated, but not encrypted.
+        # out works like in EncryptBytes (then the cryptogram length is returned instead)
+        encryptor = AESGCMEncryptor(key, IV, associatedData, self)
+        cryptogram = encryptor.UpdateInto(data, out)
+        encryptor.finalize()
+        return cryptogram, encryptor.tag
+
+    def DecryptBytesAES_GCM(self, cryptogram, key, IV, tag, associatedData = b'', out = None):
+        # authenticated decryption of binary data, the counterpart of EncryptBytesAES_GCM.
+        # raises ValueError (and out holds no usable data) if the tag does not match
+        decryptor = AESGCMDecryptor(key, IV, associatedData, tag, self)
+        message = decryptor.UpdateInto(cryptogram, out)
+        decryptor.finalize()
+        return message
+
+    def EncryptBytesAES_ECB(self, data, key, out = None, padding = True):
+        return self.EncryptBytes(data, key, 'ECB', None, out, padding)
+
+    def DecryptBytesAES_ECB(self, cryptogram, key, out = None, padding = True):
+        return self.DecryptBytes(cryptogram, key, 'ECB', None, out, padding)
+
+    def EncryptBytesAES_CBC(self, data, key, IV, out = None, padding = True):
+        return self.EncryptBytes(data, key, 'CBC', IV, out, padding)
+
+    def DecryptBytesAES_CBC(self, cryptogram, key, IV, out = None, padding = True):
+        return self.DecryptBytes(cryptogram, key, 'CBC', IV, out, padding)
+
+    def DecryptRangeAES_ECB(self, cryptogram, key, start, length, padding = True):
+        return self.DecryptRange(cryptogram, key, 'ECB', None, start, length, padding)
+
+    def DecryptRangeAES_CBC(self, cryptogram, key, IV, start, length, padding = True):
+        return self.DecryptRange(cryptogram, key, 'CBC', IV, start, length, padding)
+
+    def DecryptRange(self, cryptogram, key, mode, IV, start, length, padding = True):
+        # bytes start:start + length of the message of cryptogram (like slicing, the range is cut at the end
+        # of the message), decrypting only the blocks that hold them - a CBC message block depends only on
+        # its cryptogram block and the one before it. the padding is only read when the range reaches
+        # the last block. cryptogram is any bytes-like object (bytes, memoryview, mmap of a file...)
+        if start < 0 or length < 0:
+            raise ValueError("Range start and length can't be negative")
+        source = memoryview(cryptogram).cast('B')
+        cryptogramLength = len(source)
+        if cryptogramLength % self.bytesPerBlock != 0 or (padding and cryptogramLength == 0):
+            raise ValueError("Cryptogram length is not a multiple of block size")
+        # the blocks covering the range
+        firstStart = start // self.bytesPerBlock * self.bytesPerBlock
+        end = min(cryptogramLength, -(-(start + length) // self.bytesPerBlock) * self.bytesPerBlock)
+        if firstStart >= end: return bytearray()
+        blocks = bytearray(source[firstStart:end])
+        # CBC: the block before the first one (the IV for block 0, so it is only needed for ranges starting there)
+        previousBlock = None
+        if mode == 'CBC':
+            if firstStart == 0 and (IV is None or len(IV) != self.bytesPerBlock):
+                raise ValueError("CBC mode needs an IV of {} bytes".format(self.bytesPerBlock))
+            previousBlock = IV if firstStart == 0 else bytes(source[firstStart - self.bytesPerBlock:firstStart])
+        CryptBlocksInPlace(memoryview(blocks), keyScheduleCache.GetSchedule(key), mode + '-decrypt', previousBlock, program = self)
+        messageEnd = start + length
+        if padding and end == cryptogramLength:
+            # remove padding (revert PKCS#7 padding)
+            paddingLength = blocks[-1]
+            if paddingLength < 1 or paddingLength > self.bytesPerBlock:
+                raise ValueError("Invalid padding")
+            messageEnd = min(messageEnd, cryptogramLength - paddingLength)
+        return blocks[start - firstStart:max(0, messageEnd - firstStart)]
+
+    def EncryptBytesAES_XTS(self, data, key, sector, sectorLength = None, out = None):
+        # XTS mode (IEEE 1619) for disk sectors: data is one sector (sectorLength None) or consecutive
+        # sectors of sectorLength bytes (at least 16, a multiple of 16 or not), the first one numbered sector.
+        # key is two AES keys of the same length (32 or 64 bytes together): the first one encrypts the data,
+        # the second one the tweaks. the cryptogram is as long as the message (no padding);
+        # returns a bytearray, or the length written into out (which may be data itself - in place)
+        return self.CryptXTS(data, key, sector, sectorLength, out, True)
+
+    def DecryptBytesAES_XTS(self, cryptogram, key, sector, sectorLength = None, out = None):
+        return self.CryptXTS(cryptogram, key, sector, sectorLength, out, False)
+
+    def CryptXTS(self, data, key, sector, sectorLength, out, encrypt):
+        source = memoryview(data).cast('B')
+        length = len(source)
+        if sectorLength is None: sectorLength = length
+        if len(key) not in (32, 64):
+            raise ValueError("XTS needs two AES keys of the same length (32 or 64 bytes together)")
+        if sectorLength < self.bytesPerBlock or length % sectorLength != 0:
+            raise ValueError("Data length must be a multiple of sector length (at least {} bytes)".format(self.bytesPerBlock))
+        dataSchedule = keyScheduleCache.GetSchedule(bytes(key[:len(key) // 2]))
+        tweakSchedule = keyScheduleCache.GetSchedule(bytes(key[len(key) // 2:]))
+        target, result = self.OutputBuffer(out, length)
+        if out is not data: target[:] = source
+        # a few sectors at a time, so that the tweaks and temporary copies stay small
+        batchSectors = max(1, self.xtsBatchLength // sectorLength)
+        for first in range(0, length // sectorLength, batchSectors):
+            sectorCount = min(batchSectors, length // sectorLength - first)
+            self.CryptSectorsXTS(target[first * sectorLength:(first + sectorCount) * sectorLength], dataSchedule, tweakSchedule,
+                                 sector + first, sectorLength, encrypt)
+        return result if result is not None else length
+
+    def CryptSectorsXTS(self, target, dataSchedule, tweakSchedule, sector, sectorLength, encrypt):
+        # encrypt or decrypt the sectors in target in place.
+        # block j of a sector is xored with its tweak T_j = T_0 * alpha^j in GF(2^128) (T_0 - the sector number
+        # encrypted with the second key) before and after it is encrypted, so the whole blocks of all the sectors
+        # go through a single ECB pass. a sector that does not end at a block boundary ends with ciphertext stealing
+        sectorCount = len(target) // sectorLength
+        wholeBlocks, partialLength = divmod(sectorLength, self.bytesPerBlock)
+        # the last whole block of such a sector takes part in ciphertext stealing, not in the ECB pass
+        bulkBlocks = wholeBlocks - 1 if partialLength else wholeBlocks
+        firstTweaks = bytearray(b''.join((sector + i).to_bytes(16, 'little') for i in range(sectorCount)))
+        self.CryptBuffer(memoryview(firstTweaks), tweakSchedule, 'ECB-encrypt')
+        tweaks = [] # tweaks of the bulk blocks, sector after sector
+        stealingTweaks = [] # T_m-1 and T_m of every sector (m - wholeBlocks)
+        mask = (1 << 128) - 1
+        for i in range(sectorCount):
+            tweak = int.from_bytes(firstTweaks[16 * i:16 * i + 16], 'little')
+            for j in range(wholeBlocks + 1):
+                if j < bulkBlocks: tweaks.append(tweak.to_bytes(16, 'little'))
+                elif partialLength: stealingTweaks.append(tweak.to_bytes(16, 'little'))
+                # multiplication by alpha: shift left, x^128 = x^7 + x^2 + x + 1 (0x87) when the top bit drops out
+                tweak = ((tweak << 1) & mask) ^ ((tweak >> 127) * 0x87)
+        tweakStream = b''.join(tweaks)
+        if partialLength:
+            bulk = b''.join(target[i * sectorLength:i * sectorLength + 16 * bulkBlocks] for i in range(sectorCount))
+        else:
+            bulk = target
+        if len(tweakStream) > 0:
+            blocks = bytearray(xorBytes(bulk, tweakStream))
+            self.CryptBuffer(memoryview(blocks), dataSchedule, 'ECB-encrypt' if encrypt else 'ECB-decrypt')
+            blocks = xorBytes(blocks, tweakStream)
+            if partialLength:
+                for i in range(sectorCount):
+                    target[i * sectorLength:i * sectorLength + 16 * bulkBlocks] = blocks[16 * bulkBlocks * i:16 * bulkBlocks * (i + 1)]
+            else:
+                target[:] = blocks
+        if not partialLength: return
+        # ciphertext stealing: the last whole block is encrypted, the start of the result becomes the partial block,
+        # the partial block padded with the rest of the result is encrypted into the last whole block (decryption
+        # undoes that in reverse order, so it uses T_m before T_m-1)
+        operation = 'ECB-encrypt' if encrypt else 'ECB-decrypt'
+        def crypt(block, schedule):
+            block = bytearray(block)
+            CryptBlocksInPlace(memoryview(block), schedule, operation, program = self)
+            return bytes(block)
+        for i in range(sectorCount):
+            lastStart = i * sectorLength + 16 * (wholeBlocks - 1)
+            firstTweak, secondTweak = stealingTweaks[2 * i:2 * i + 2]
+            if not encrypt: firstTweak, secondTweak = secondTweak, firstTweak
+            lastBlock = xorBytes(crypt(xorBytes(target[lastStart:lastStart + 16], firstTweak), dataSchedule), firstTweak)
+            stolenBlock = bytes(target[lastStart + 16:lastStart + 16 + partialLength]) + lastBlock[partialLength:]
+            target[lastStart + 16:lastStart + 16 + partialLength] = lastBlock[:partialLength]
+            target[lastStart:lastStart + 16] = xorBytes(crypt(xorBytes(stolenBlock, secondTweak), dataSchedule), secondTweak)
+
+    def EncryptBytes(self, data, key, mode, IV = None, out = None, padding = True):
+        # encrypt binary data: any object supporting the buffer protocol
+        # (bytes, bytearray, memoryview, mmap, array...), without converting to text.
+        # without out a new bytearray holding the cryptogram is returned;
+        # otherwise the cryptogram is written into the writable buffer out
+        # (which may be data itself - encryption in place) and its length is returned.
+        # with padding out must have room for the PKCS#7 padding after the message,
+        # without it the message length must be a multiple of block size
+        source = memoryview(data).cast('B')
+        length = len(source)
+        if padding:
+            cryptogramLength = (length // self.bytesPerBlock + 1) * self.bytesPerBlock
+        elif length % self.bytesPerBlock != 0:
+            raise ValueError("Message length is not a multiple of block size (use padding)")
+        else:
+            cryptogramLength = length
+        target, result = self.OutputBuffer(out, cryptogramLength)
+        # copy the message to its place in the output, unless encrypting in place
+        if out is not data: target[:length] = source
+        if padding:
+            paddingLength = cryptogramLength - length
+            target[length:] = bytes([paddingLength]) * paddingLength
+        self.CryptBuffer(target, keyScheduleCache.GetSchedule(key), mode + '-encrypt', IV)
+        return result if result is not None else cryptogramLength
+
+    def DecryptBytes(self, cryptogram, key, mode, IV = None, out = None, padding = True):
+        # decrypt binary data, the counterpart of EncryptBytes.
+        # out must have room for the whole cryptogram (padding included),
+        # the returned length (or bytearray) excludes the padding
+        source = memoryview(cryptogram).cast('B')
+        length = len(source)
+        if length % self.bytesPerBlock != 0 or (padding and length == 0):
+            raise ValueError("Cryptogram length is not a multiple of block size")
+        target, result = self.OutputBuffer(out, length)
+        if out is not cryptogram: target[:] = source
+        self.CryptBuffer(target, keyScheduleCache.GetSchedule(key), mode + '-decrypt', IV)
+        messageLength = length
+        if padding:
+            # remove padding (revert PKCS#7 padding)
+            paddingLength = target[-1]
+            if paddingLength < 1 or paddingLength > self.bytesPerBlock:
+                raise ValueError("Invalid padding")
+            messageLength -= paddingLength
+        if result is None: return messageLength
+        target.release() # the bytearray can't be shortened while it is viewed
+        del result[messageLength:]
+        return result
+
+    def EncryptFileAES(self, inputPath, outputPath, key, mode, IV = None, syncWindows = 0):
+        # encrypt a file of any size (also larger than memory) into outputPath (None - in place)
+        # in ECB, CBC (PKCS#7 padding) or CTR mode (IV is the nonce there).
+        # the output is mapped into memory one window (fileWindowLength bytes) at a time and
+        # encrypted in place there, so only about one window is held in memory at once.
+        # syncWindows > 0 - fsync after every syncWindows windows and at the end
+        # (0 - writing the file to disk is left to the operating system). returns the cryptogram length
+        if mode not in ('ECB', 'CBC', 'CTR'):
+            raise ValueError("Unsupported mode: {}".format(mode))
+        self.CheckFileIV(mode, IV)
+        schedule = keyScheduleCache.GetSchedule(key)
+        with self.OpenFiles(inputPath, outputPath) as (source, target):
+            length = os.fstat(source.fileno()).st_size
+            # whole blocks are encrypted in the windows, the last (padded) block separately
+            bulkLength = length if mode == 'CTR' else length - length % self.bytesPerBlock
+            cryptogramLength = length if mode == 'CTR' else bulkLength + self.bytesPerBlock
+            os.ftruncate(target.fileno(), cryptogramLength)
+            previousBlock = IV # CBC: latest cryptogram block
+            for window, start in self.FileWindows(source, target, bulkLength, syncWindows):
+                if mode == 'CTR':
+                    self.CryptBytesAES_CTR(window, schedule, IV, start, window)
+                else:
+                    self.CryptBuffer(window, schedule, mode + '-encrypt', previousBlock)
+                    if mode == 'CBC': previousBlock = bytes(window[-self.bytesPerBlock:])
+            if mode != 'CTR':
+                # the rest of the message with PKCS#7 padding
+                lastBlock = bytearray(os.pread(source.fileno(), length - bulkLength, bulkLength))
+                paddingLength = self.bytesPerBlock - len(lastBlock)
+                lastBlock += bytes([paddingLength]) * paddingLength
+                CryptBlocksInPlace(memoryview(lastBlock), schedule, mode + '-encrypt', previousBlock, program = self)
+                os.pwrite(target.fileno(), lastBlock, bulkLength)
+            if syncWindows: os.fsync(target.fileno())
+        return cryptogramLength
+
+    def DecryptFileAES(self, inputPath, outputPath, key, mode, IV = None, syncWindows = 0):
+        # decrypt a file made by EncryptFileAES into outputPath (None - in place), returns the message length.
+        # the padding is checked before anything is written
+        if mode not in ('ECB', 'CBC', 'CTR'):
+            raise ValueError("Unsupported mode: {}".format(mode))
+        self.CheckFileIV(mode, IV)
+        schedule = keyScheduleCache.GetSchedule(key)
+        with self.OpenFiles(inputPath, outputPath) as (source, target):
+            length = os.fstat(source.fileno()).st_size
+            bulkLength = length
+            if mode != 'CTR':
+                if length == 0 or length % self.bytesPerBlock != 0:
+                    raise ValueError("Cryptogram length is not a multiple of block size")
+                # decrypt the last block first, it tells the message length
+                bulkLength = length - self.bytesPerBlock
+                lastBlock = bytearray(os.pread(source.fileno(), self.bytesPerBlock, bulkLength))
+                lastPreviousBlock = IV if bulkLength == 0 else os.pread(source.fileno(), self.bytesPerBlock, bulkLength - self.bytesPerBlock)
+                CryptBlocksInPlace(memoryview(lastBlock), schedule, mode + '-decrypt', lastPreviousBlock, program = self)
+                # remove padding (revert PKCS#7 padding)
+                paddingLength = lastBlock[-1]
+                if paddingLength < 1 or paddingLength > self.bytesPerBlock:
+                    raise ValueError("Invalid padding")
+                del lastBlock[-paddingLength:]
+            messageLength = length if mode == 'CTR' else bulkLength + len(lastBlock)
+            if target is not source: os.ftruncate(target.fileno(), messageLength)
+            previousBlock = IV # CBC: cryptogram block before the window
+            for window, start in self.FileWindows(source, target, bulkLength, syncWindows):
+                if mode == 'CTR':
+                    self.CryptBytesAES_CTR(window, schedule, IV, start, window)
+                else:
+                    # the window is decrypted in place, its last cryptogram block is needed by the next one
+                    nextPreviousBlock = bytes(window[-self.bytesPerBlock:])
+                    self.CryptBuffer(window, schedule, mode + '-decrypt', previousBlock)
+                    previousBlock = nextPreviousBlock
+            if mode != 'CTR':
+                os.pwrite(target.fileno(), lastBlock, bulkLength)
+                if target is source: os.ftruncate(target.fileno(), messageLength)
+            if syncWindows: os.fsync(target.fileno())
+        return messageLength
+
+    def EncryptContainer(self, inputPath, outputPath, key, mode = 'CBC', chunkLength = None, resume = False):
+        # encrypt a file into a container of independently encrypted chunks (see AESContainer).
+        # chunks are encrypted by the worker processes when parallelWorkers is set, and written in any order.
+        # resume - continue a container that was left incomplete (interrupted), from its last complete chunk.
+        # returns the message length
+        from .AES_Container import AESContainerWriter
+        chunkLength = chunkLength if chunkLength is not None else self.containerChunkLength
+        with AESContainerWriter(outputPath, key, mode, chunkLength, resume, self) as writer, open(inputPath, 'rb') as source:
+            length = os.fstat(source.fileno()).st_size
+            # the last chunk is the one holding the end of the message (an empty one for an empty message).
+            # it is always written, even if resuming found it complete (see AESContainerWriter)
+            chunkCount = max(1, -(-length // chunkLength))
+            def Chunks():
+                for index in range(min(writer.chunkCount, chunkCount - 1), chunkCount):
+                    yield index, os.pread(source.fileno(), chunkLength, index * chunkLength), index == chunkCount - 1
+            self.RunChunks(Chunks(), key, mode, False, lambda index, record, last: writer.WriteRecord(index, record, last), writer.AssociatedData)
+        return length
+
+    def DecryptContainer(self, inputPath, outputPath, key):
+        # decrypt a container made by EncryptContainer into outputPath, returns the message length
+        from .AES_Container import AESContainerReader
+        with AESContainerReader(inputPath, key, self) as reader, open(outputPath, 'w+b') as target:
+            def Chunks():
+                for index in range(reader.chunkCount):
+                    yield index, reader.ReadRecord(index), index == reader.chunkCount - 1
+            length = 0
+            def Write(index, message, last):
+                nonlocal length
+                os.pwrite(target.fileno(), message, index * reader.chunkLength)
+                if last: length = index * reader.chunkLength + len(message)
+            self.RunChunks(Chunks(), key, reader.mode, True, Write, reader.AssociatedData)
+            target.truncate(length)
+        return length
+
+    def RunChunks(self, chunks, key, mode, decrypt, write, associatedData):
+        # encrypt (decrypt) every (index, data, last) of chunks with AESContainerChunk and pass
+        # (index, result, last) to write, on the worker processes if they are enabled.
+        # associatedData(index, last) gives the associated data of a chunk (AESContainer.AssociatedData).
+        # at most two chunks per worker are in flight, so memory does not grow with the file
+        from .AES_Container import AESContainerChunk
+        if self.parallelWorkers == 0:
+            for index, data, last in chunks:
+                write(index, AESContainerChunk(key, mode, data, last, decrypt, associatedData(index, last)), last)
+            return
+        from .AES_Pool import processPool
+        pending = []
+        for index, data, last in chunks:
+            pending.append((index, last, processPool.Submit(self.parallelWorkers, AESContainerChunk, key, mode, data, last, decrypt, associatedData(index, last))))
+            if len(pending) >= 2 * processPool.Workers(self.parallelWorkers):
+                index, last, future = pending.pop(0)
+                write(index, future.result(), last)
+        for index, last, future in pending:
+            write(index, future.result(), last)
+
+    def CheckFileIV(self, mode, IV):
+        # a missing IV (nonce) is reported before any file is opened or truncated
+        if mode == 'CBC' and (IV is None or len(IV) != self.bytesPerBlock):
+            raise ValueError("CBC mode needs an IV of {} bytes".format(self.bytesPerBlock))
+        if mode == 'CTR' and IV is None:
+            raise ValueError("CTR mode needs a nonce")
+
+    @contextmanager
+    def OpenFiles(self, inputPath, outputPath):
+        # (source, target) files of EncryptFileAES and DecryptFileAES, the same file object when working in place
+        if outputPath is None or (os.path.exists(outputPath) and os.path.samefile(inputPath, outputPath)):
+            with open(inputPath, 'r+b') as file:
+                yield file, file
+        else:
+            with open(inputPath, 'rb') as source, open(outputPath, 'w+b') as target:
+                yield source, target
+
+    def FileWindows(self, source, target, length, syncWindows = 0):
+        # the first length bytes of target mapped into memory one window at a time, as (writable view, offset).
+        # each window is a copy of the same bytes of source (unless the files are the same) to be processed in place
+        granularity = mmap.ALLOCATIONGRANULARITY # windows must start at a multiple of it
+        windowLength = max(granularity, self.fileWindowLength // granularity * granularity)
+        for count, start in enumerate(range(0, length, windowLength), 1):
+            size = min(windowLength, length - start)
+            targetMap = mmap.mmap(target.fileno(), size, offset = start)
+            window = memoryview(targetMap)
+            try:
+                if target is not source:
+                    with mmap.mmap(source.fileno(), size, offset = start, access = mmap.ACCESS_READ) as sourceMap:
+                        window[:] = sourceMap
+                yield window, start
+            finally:
+                window.release()
+                targetMap.close()
+            if syncWindows and count % syncWindows == 0: os.fsync(target.fileno())
+
+    def OutputBuffer(self, out, length):
+        # a writable byte view of length bytes to write the result into,
+        # and the new bytearray behind it if out was not given
+        if out is None:
+            result = bytearray(length)
+            return memoryview(result), result
+        target = memoryview(out).cast('B')
+        if target.readonly:
+            raise ValueError("Output buffer is read-only")
+        if len(target) < length:
+            raise ValueError("Output buffer too small: {} bytes needed, {} given".format(length, len(target)))
+        return target[:length], None
+
+    def CryptBuffer(self, target, schedule, operation, IV = None):
+        # run operation on the whole blocks of target in place,
+        # using worker processes for large payloads if they are enabled
+        if operation != 'CBC-encrypt' and self.UseParallel(len(target)):
+            target[:] = self.ParallelCrypt(target, schedule, operation, IV)
+        else:
+            CryptBlocksInPlace(target, schedule, operation, IV, program = self)
+
+    def MessageToBuffer(self, message):
+        # convert string to bytes with PKCS#7 padding: a single buffer of the padded length,
+        # the padding is written straight into its tail (an empty message is one block of padding)
+        stringBytes = message.encode(self.encoding)
+        length = len(stringBytes)
+        paddingLength = self.bytesPerBlock - length % self.bytesPerBlock
+        buffer = bytearray(length + paddingLength)
+        buffer[:length] = stringBytes
+        buffer[length:] = bytes([paddingLength]) * paddingLength
+        return buffer
+
+    def BufferToMessage(self, buffer):
+        # remove padding (revert PKCS#7 padding) and convert to string, without copying the bytes.
+        # a cryptogram that is not whole blocks or has invalid padding raises ValueError (like DecryptBytes)
+        if len(buffer) == 0 or len(buffer) % self.bytesPerBlock != 0:
+            raise ValueError("Cryptogram length is not a multiple of block size")
+        paddingBytes = buffer[-1]
+        if paddingBytes < 1 or paddingBytes > self.bytesPerBlock:
+            raise ValueError("Invalid padding")
+        return str(memoryview(buffer)[:len(buffer) - paddingBytes], self.encoding, 'ignore')
+
+    def MessageToMessageBlocks(self, message):
+        # blockLength long windows into the padded message (see MessageToBuffer), no block is copied
+        view = memoryview(self.MessageToBuffer(message))
+        return [view[i:i + self.bytesPerBlock] for i in range(0, len(view), self.bytesPerBlock)]
+
+    def MessageBlocksToMessage(self, byteBlocks):
+        # concatenate blocks into a single buffer, then remove padding and convert to string
+        return self.BufferToMessage(b''.join(byteBlocks))
+
+    def CryptogramBlocksToCryptogram(self, cryptogramBlocks):
+        # concatenate blocks into a single byte string
+        return b''.join(cryptogramBlocks)
+
+    def CryptogramToCryptogramBlocks(self, cryptogram):
+        # blockLength long windows into the cryptogram, no block is copied
+        view = memoryview(cryptogram)
+        return [view[i:i + self.bytesPerBlock] for i in range(0, len(view), self.bytesPerBlock)]
+
+    def Tests(self):
+        allowedKeyLengths = [16, 24, 32]
+
+        errorCount = 0
+        print("Hello, this is our AES implementation in python:")
+        for test in self.tests:
+            if self.tests[test].get('format') == 'hex':
+                errorCount += self.TestBinary(test)
+                continue
+            keyString = self.tests[test]['key']
+            key = bytearray(keyString, self.encoding)
+
+            keyLength = len(key)
+            if(keyLength not in allowedKeyLengths):
+                print("Error: Incorrect test detected:\n Key of unsupported length for test: {}\n please fix and run tests again".format(test), file = sys.stderr)
+                return
+            key = key.ljust(keyLength, b'\0')
+            mode = self.tests[test]['mode']
+            message = self.tests[test]['message']
+            print("\nEncrypting the following message in {} mode, (key :{}):".format(mode, key))
+            print(message)
+            if mode == "ECB":
+                # use ECB mode 
+                print("Result:")
+                cryptogram = self.EncryptAES_ECB(message, key)
+                expectedCryptogram = self.tests[test]['expectedCryptogram']         
+                errorCount += self.TestAndAnnounce(cryptogram.hex(), expectedCryptogram)
+                print('Decrypting...')
+                decryptedMessage = self.DecryptAES_ECB(cryptogram, key)
+                print('Decrypted message:')
+                errorCount += self.TestAndAnnounce(decryptedMessage, message)
+            elif mode == "CBC":
+                
+                if(self.tests[test]['initialValue'] == None or len(self.tests[test]['initialValue']) != self.bytesPerBlock) :
+                    print("Error: Incorrect test detected:\n Invalid initialValue for CBC test: {}\n please fix and run tests again".format(test), file = sys.stderr)
+                    return
+                # use CBC mode
+                iv = bytearray(self.tests[test]['initialValue'], self.encoding)
+                print('Using Initial Variable: {}'.format(iv))        
+                print("Result:")
+                cryptogram = self.EncryptAES_CBC(message, key, iv)
+                expectedCryptogram = self.tests[test]['expectedCryptogram']
+                errorCount += self.TestAndAnnounce(cryptogram.hex(), expectedCryptogram)
+                print('Decrypting...')
+                decryptedMessage = self.DecryptAES_CBC(cryptogram, key, iv)
+                print('Decrypted message:')
+                errorCount += self.TestAndAnnounce(decryptedMessage, message)
+            elif mode == "CTR":
+                if(self.tests[test]['initialValue'] == None or len(self.tests[test]['initialValue']) != self.bytesPerBlock) :
+                    print("Error: Incorrect test detected:\n Invalid initialValue for CTR test: {}\n please fix and run tests again".format(test), file = sys.stderr)
+                    return
+                # use CTR mode, initialValue is the first counter block
+                nonce = bytearray(self.tests[test]['initialValue'], self.encoding)
+                print('Using initial counter: {}'.format(nonce))
+                print("Result:")
+                cryptogram = self.EncryptAES_CTR(message, key, nonce)
+                expectedCryptogram = self.tests[test]['expectedCryptogram']
+                errorCount += self.TestAndAnnounce(cryptogram.hex(), expectedCryptogram)
+                print('Decrypting...')
+                decryptedMessage = self.DecryptAES_CTR(cryptogram, key, nonce)
+                print('Decrypted message:')
+                errorCount += self.TestAndAnnounce(decryptedMessage, message)
+        errorCount += self.TestsGCM()
+        errorCount += self.TestsXTS()
+        errorCount += self.TestsEngines()
+        errorCount += self.TestsContainer()
+        errorCount += self.TestsIncremental()
+        errorCount += self.TestsOutput()
+        errorCount += self.TestsStream()
+        errorCount += self.TestsLanes()
+        errorCount += self.TestsFiles()
+        errorCount += self.TestsRanges()
+        if(errorCount > 0):
+            print('Tests Failed: {}'.format(errorCount))
+        else:
+            print('All tests passed.')
+
+
+    def TestBinary(self, test):
+        # a test of self.tests given in hex format: whole blocks, encrypted without padding
+        vector = self.tests[test]
+        key, message = bytes.fromhex(vector['key']), bytes.fromhex(vector['message'])
+        IV = bytes.fromhex(vector['initialValue']) if vector['initialValue'] is not None else None
+        print("\nEncrypting in {} mode: {} (key: {})".format(vector['mode'], test, key.hex()))
+        print(message.hex())
+        print("Result:")
+        cryptogram = self.EncryptBytes(message, key, vector['mode'], IV, padding = False)
+        errorCount = self.TestAndAnnounce(bytes(cryptogram).hex(), vector['expectedCryptogram'])
+        print('Decrypting...')
+        decryptedMessage = self.DecryptBytes(cryptogram, key, vector['mode'], IV, padding = False)
+        print('Decrypted message:')
+        errorCount += self.TestAndAnnounce(bytes(decryptedMessage).hex(), message.hex())
+        return errorCount
+
+    def TestsGCM(self):
+        errorCount = 0
+        for test in self.gcmTests:
+            # GCM test vectors are binary, given in hex format
+            key, IV, message, associatedData = [bytes.fromhex(self.gcmTests[test][field]) for field in ('key', 'IV', 'message', 'associatedData')]
+            print("\nEncrypting in GCM mode: {} (key: {}, IV: {})".format(test, key.hex(), IV.hex()))
+            print("Result:")
+            cryptogram, tag = self.EncryptBytesAES_GCM(message, key, IV, associatedData)
+            errorCount += self.TestAndAnnounce(bytes(cryptogram).hex(), self.gcmTests[test]['expectedCryptogram'])
+            print("Tag:")
+            errorCount += self.TestAndAnnounce(tag.hex(), self.gcmTests[test]['expectedTag'])
+            print('Decrypting...')
+            decryptedMessage = self.DecryptBytesAES_GCM(cryptogram, key, IV, tag, associatedData)
+            print('Decrypted message:')
+            errorCount += self.TestAndAnnounce(bytes(decryptedMessage).hex(), message.hex())
+        return errorCount
+
+    def TestsXTS(self):
+        errorCount = 0
+        for test in self.xtsTests:
+            key, message = [bytes.fromhex(self.xtsTests[test][field]) for field in ('key', 'message')]
+            sector = self.xtsTests[test]['sector']
+            print("\nEncrypting in XTS mode: {} (key: {}, sector: {:x})".format(test, key.hex(), sector))
+            print("Result:")
+            cryptogram = self.EncryptBytesAES_XTS(message, key, sector)
+            errorCount += self.TestAndAnnounce(bytes(cryptogram).hex(), self.xtsTests[test]['expectedCryptogram'])
+            print('Decrypting...')
+            decryptedMessage = self.DecryptBytesAES_XTS(cryptogram, key, sector)
+            print('Decrypted message:')
+            errorCount += self.TestAndAnnounce(bytes(decryptedMessage).hex(), message.hex())
+        return errorCount
+
+    def TestsContainer(self):
+        # containers survive resuming: a complete one (its last chunk is as long as the others)
+        # and one cut off inside a record decrypt to the message
+        import tempfile
+        errorCount = 0
+        message = bytes(range(256)) * 16
+        key = bytes(range(16))
+        with tempfile.TemporaryDirectory() as directory:
+            inputPath, containerPath, outputPath = [os.path.join(directory, name) for name in ('message', 'container', 'output')]
+            with open(inputPath, 'wb') as file:
+                file.write(message)
+            for mode in ('CBC', 'CTR', 'GCM'):
+                for cut in (None, 2500):
+                    self.EncryptContainer(inputPath, containerPath, key, mode, 1024)
+                    if cut is not None: os.truncate(containerPath, cut)
+                    self.EncryptContainer(inputPath, containerPath, key, mode, 1024, resume = True)
+                    print("\nResuming a container in {} mode ({}), decrypted message:".format(mode, "complete" if cut is None else "cut off"))
+                    try:
+                        self.DecryptContainer(containerPath, outputPath, key)
+                        with open(outputPath, 'rb') as file:
+                            result = file.read() == message
+                    except ValueError as exception:
+                        result = str(exception)
+                    errorCount += self.TestAndAnnounce(result, True)
+        return errorCount
+
+    def TestsEngines(self):
+        # every engine that can run here gives the results of the tests vectors
+        # and the same results as the reference engine on random data
+        errorCount = 0
+        for name in engines.Available():
+            print("\nChecking engine: {} (operations: {})".format(name, ", ".join(engines.Get(name).operations)))
+            print("Failed checks:")
+            errorCount += self.TestAndAnnounce(engines.CheckEngine(engines.Get(name)), [])
+        return errorCount
+
+    def TestsIncremental(self):
+        # incremental contexts (NewEncryptor, NewDecryptor) give the results of the one-shot functions
+        # whatever sizes the pieces they are fed have (pieces end inside blocks and span several blocks)
+        errorCount = 0
+        for test in self.incrementalTests:
+            vector = self.incrementalTests[test]
+            mode, chunkLengths = vector['mode'], vector['chunkLengths']
+            key, message, associatedData = [bytes.fromhex(vector.get(field, '')) for field in ('key', 'message', 'associatedData')]
+            IV = bytes.fromhex(vector['IV']) if vector['IV'] is not None else None
+            print("\nEncrypting in {} mode in pieces of {} bytes: {}".format(mode, chunkLengths, test))
+            print("Result:")
+            encryptor = self.NewEncryptor(mode, key, IV, associatedData)
+            cryptogram = b''.join(bytes(encryptor.update(piece)) for piece in self.Pieces(message, chunkLengths))
+            cryptogram += bytes(encryptor.finalize())
+            errorCount += self.TestAndAnnounce(cryptogram.hex(), vector['expectedCryptogram'])
+            tag = None
+            if mode == 'GCM':
+                tag = encryptor.tag
+                print("Tag:")
+                errorCount += self.TestAndAnnounce(tag.hex(), vector['expectedTag'])
+            # decrypt in pieces of other sizes than the ones used to encrypt
+            chunkLengths = chunkLengths[::-1]
+            print('Decrypting in pieces of {} bytes...'.format(chunkLengths))
+            decryptor = self.NewDecryptor(mode, key, IV, associatedData, tag)
+            decryptedMessage = b''.join(bytes(decryptor.update(piece)) for piece in self.Pieces(cryptogram, chunkLengths))
+            decryptedMessage += bytes(decryptor.finalize())
+            print('Decrypted message:')
+            errorCount += self.TestAndAnnounce(decryptedMessage.hex(), message.hex())
+        return errorCount
+
+    def TestsOutput(self):
+        # the binary functions write into a given buffer (out), also the one holding the input (in place):
+        # the message is then the start of the buffer, the rest is room for the padding (or nothing)
+        errorCount = 0
+        for test in self.outputTests:
+            vector = self.outputTests[test]
+            mode, padding, inPlace = vector['mode'], vector['padding'], vector['inPlace']
+            key, message, associatedData = [bytes.fromhex(vector.get(field, '')) for field in ('key', 'message', 'associatedData')]
+            IV = bytes.fromhex(vector['IV']) if vector['IV'] is not None else None
+            cryptogramLength = len(vector['expectedCryptogram']) // 2
+            out = bytearray(message) + bytearray(cryptogramLength - len(message)) if inPlace else bytearray(cryptogramLength)
+            data = memoryview(out)[:len(message)] if inPlace else message
+            print("\nEncrypting in {} mode {}: {}".format(mode, "in place" if inPlace else "into a buffer", test))
+            print("Result:")
+            if mode == 'CTR':
+                length = self.CryptBytesAES_CTR(data, key, IV, out = out)
+            elif mode == 'GCM':
+                length, tag = self.EncryptBytesAES_GCM(data, key, IV, associatedData, out)
+            else:
+                length = self.EncryptBytes(data, key, mode, IV, out, padding)
+            errorCount += self.TestAndAnnounce(bytes(out[:length]).hex(), vector['expectedCryptogram'])
+            if mode == 'GCM':
+                print("Tag:")
+                errorCount += self.TestAndAnnounce(tag.hex(), vector['expectedTag'])
+            print('Decrypting...')
+            cryptogram = out if inPlace else bytes(out)
+            if not inPlace: out = bytearray(cryptogramLength)
+            if mode == 'CTR':
+                length = self.CryptBytesAES_CTR(cryptogram, key, IV, out = out)
+            elif mode == 'GCM':
+                length = self.DecryptBytesAES_GCM(cryptogram, key, IV, tag, associatedData, out)
+            else:
+                length = self.DecryptBytes(cryptogram, key, mode, IV, out, padding)
+            print('Decrypted message:')
+            errorCount += self.TestAndAnnounce(bytes(out[:length]).hex(), message.hex())
+        return errorCount
+
+    def TestsStream(self):
+        # EncryptStream and DecryptStream (AESStream) give the results of the one-shot functions, reading
+        # an asyncio.StreamReader or an async iterator of pieces of any size. chunks are short, so both
+        # the event loop and threadPool process some of them (chunkLength and offloadLength of the test)
+        import asyncio
+
+        class Writer(bytearray):
+            # the part of asyncio.StreamWriter used by AESStream, keeping what is written
+            def write(self, data): self.extend(data)
+            async def drain(self): pass
+
+        def Source(vector, data):
+            if vector['source'] == 'reader':
+                reader = asyncio.StreamReader()
+                reader.feed_data(data)
+                reader.feed_eof()
+                return reader
+            async def Iterator():
+                for piece in self.Pieces(data, vector['pieceLengths']):
+                    yield piece
+            return Iterator()
+
+        async def Roundtrip(program, vector, key, IV, message, associatedData):
+            cryptogram, decryptedMessage = Writer(), Writer()
+            tag = await program.EncryptStream(Source(vector, message), cryptogram, key, vector['mode'], IV, associatedData)
+            await program.DecryptStream(Source(vector, bytes(cryptogram)), decryptedMessage, key, vector['mode'], IV, tag, associatedData)
+            return bytes(cryptogram), tag, bytes(decryptedMessage)
+
+        errorCount = 0
+        for test in self.streamTests:
+            vector = self.streamTests[test]
+            mode = vector['mode']
+            key, IV, associatedData = [bytes.fromhex(vector.get(field, '')) for field in ('key', 'IV', 'associatedData')]
+            message = bytes(index % 251 for index in range(vector['messageLength']))
+            program = AES_Program()
+            program.streamChunkLength, program.streamOffloadLength = vector['chunkLength'], vector['offloadLength']
+            if mode == 'GCM':
+                expectedCryptogram, expectedTag = self.EncryptBytesAES_GCM(message, key, IV, associatedData)
+            elif mode == 'CTR':
+                expectedCryptogram, expectedTag = self.CryptBytesAES_CTR(message, key, IV), None
+            else:
+                expectedCryptogram, expectedTag = self.EncryptBytes(message, key, mode, IV), None
+            print("\nStreaming {} bytes in {} mode: {}".format(len(message), mode, test))
+            try:
+                cryptogram, tag, decryptedMessage = asyncio.run(Roundtrip(program, vector, key, IV, message, associatedData))
+            except ValueError as exception:
+                cryptogram = tag = decryptedMessage = str(exception)
+            print("Cryptogram and tag are the ones of the one-shot functions:")
+            errorCount += self.TestAndAnnounce(cryptogram == bytes(expectedCryptogram) and tag == expectedTag, True)
+            print('Decrypted message is the message:')
+            errorCount += self.TestAndAnnounce(decryptedMessage == message, True)
+        return errorCount
+
+    def TestsLanes(self):
+        # EncryptLanesAES_CBC gives the cryptograms of encrypting each message on its own, on every way
+        # of running the lanes (numpy - the numpy one only if numpy is installed, bitslice, one message after another)
+        errorCount = 0
+        for test in self.laneTests:
+            vector = self.laneTests[test]
+            count, messageLengths, keyLengths = vector['messageCount'], vector['messageLengths'], vector['keyLengths']
+            messages = [bytes((lane + index) % 256 for index in range(messageLengths[lane % len(messageLengths)])) for lane in range(count)]
+            keys = [bytes((7 * lane + index) % 256 for index in range(keyLengths[lane % len(keyLengths)])) for lane in range(count)]
+            IVs = [bytes((13 * lane + index) % 256 for index in range(self.bytesPerBlock)) for lane in range(count)]
+            if len(keyLengths) == 1: keys = keys[0]
+            program = AES_Program()
+            program.useNumpy, program.useBitslice = vector['useNumpy'], vector['useBitslice']
+            print("\nEncrypting {} messages as lanes in CBC mode: {}".format(count, test))
+            print("Cryptograms are the ones of each message encrypted on its own:")
+            cryptograms = program.EncryptLanesAES_CBC(messages, keys, IVs)
+            expectedCryptograms = [self.EncryptBytesAES_CBC(message, key, IV) for message, key, IV
+                                   in zip(messages, keys if isinstance(keys, list) else [keys] * count, IVs)]
+            errorCount += self.TestAndAnnounce(cryptograms == expectedCryptograms, True)
+        return errorCount
+
+    def TestsFiles(self):
+        # EncryptFileAES and DecryptFileAES give the results of the one-shot functions when the file
+        # spans several windows (windows as short as allowed), in place and into another file
+        import tempfile
+        errorCount = 0
+        program = AES_Program()
+        program.fileWindowLength = mmap.ALLOCATIONGRANULARITY
+        with tempfile.TemporaryDirectory() as directory:
+            for test in self.fileTests:
+                inputPath, cryptogramPath, outputPath = [os.path.join(directory, name) for name in ('message', 'cryptogram', 'output')]
+                vector = self.fileTests[test]
+                mode, inPlace = vector['mode'], vector['inPlace']
+                key, IV = bytes.fromhex(vector['key']), bytes.fromhex(vector['IV']) if vector['IV'] is not None else None
+                message = bytes(index % 251 for index in range(vector['windows'] * mmap.ALLOCATIONGRANULARITY + vector['extraLength']))
+                with open(inputPath, 'wb') as file:
+                    file.write(message)
+                if inPlace: cryptogramPath = outputPath = inputPath
+                print("\nEncrypting a file of {} bytes in {} mode {}: {}".format(len(message), mode, "in place" if inPlace else "into another file", test))
+                print("Cryptogram is the one of the one-shot functions:")
+                program.EncryptFileAES(inputPath, None if inPlace else cryptogramPath, key, mode, IV)
+                with open(cryptogramPath, 'rb') as file:
+                    cryptogram = file.read()
+                expectedCryptogram = self.CryptBytesAES_CTR(message, key, IV) if mode == 'CTR' else self.EncryptBytes(message, key, mode, IV)
+                errorCount += self.TestAndAnnounce(cryptogram == expectedCryptogram, True)
+                print('Decrypted message is the message:')
+                program.DecryptFileAES(cryptogramPath, None if inPlace else outputPath, key, mode, IV)
+                with open(outputPath, 'rb') as file:
+                    errorCount += self.TestAndAnnounce(file.read() == message, True)
+        return errorCount
+
+    def TestsRanges(self):
+        # DecryptRange gives the slices of the message: ranges at block boundaries, inside blocks,
+        # reaching into the padding and past the end of the message
+        errorCount = 0
+        for test in self.rangeTests:
+            vector = self.rangeTests[test]
+            mode, padding = vector['mode'], vector['padding']
+            key, IV = bytes.fromhex(vector['key']), bytes.fromhex(vector['IV']) if vector['IV'] is not None else None
+            message = bytes(index % 251 for index in range(vector['messageLength']))
+            cryptogram = self.EncryptBytes(message, key, mode, IV, padding = padding)
+            print("\nDecrypting ranges [start, length] of a {} byte message in {} mode: {}".format(len(message), mode, test))
+            print(vector['ranges'])
+            print("Wrong ranges:")
+            wrongRanges = [[start, length] for start, length in vector['ranges']
+                           if self.DecryptRange(cryptogram, key, mode, IV, start, length, padding) != message[start:start + length]]
+            errorCount += self.TestAndAnnounce(wrongRanges, [])
+        return errorCount
+
+    def Pieces(self, data, lengths):
+        # data cut into pieces of the given lengths (taken in turn until data ends)
+        position, index = 0, 0
+        while position < len(data):
+            length = lengths[index % len(lengths)]
+            yield data[position:position + length]
+            position, index = position + length, index + 1
+
+    def TestAndAnnounce(self, result, reference):
+        print(result)
+        if(reference == None):
+            return 0
+        if(result == reference):
+            print("Correct!")
+            return 0
+        print("Incorrect! Expected:")
+        print(reference)
+        return 1
+        
+
+#TESTS
+# trusted source: https://www.javainuse.com/aesgenerator  (expectecCryptograms are in hex format):
+    tests = {
+        "ECB": {
+            "mode": "ECB",
+            "key": "SuperSecret1234512345678",
+            "initialValue": None,
+            "message": "123456789ABCDEF123456789ABCDEF123456789AB",
+            "expectedCryptogram": '2a6e8a3df1847ab182d035e3ef65b203bcaa495bafff5f75827329311e32d25e0a108e8bfbe29c32ab6e8aca6e97224f',
+        },
+        "CBC": {
+            "mode": "CBC",
+            "key": "SuperSecret1234512345678",
+            "initialValue": "InitVarOLength16",
+            "message": "123456789ABCDEF123456789ABCDEF123456789AB",
+            "expectedCryptogram": '0966b37a583dcd2a6713ed3cd894301be1d8443f9ab2db2bc1e9677203a72beeb9d6b933b28724410e8740999b90cd10',
+        },
+        "ECB2": {
+            "mode": "ECB",
+            "key": "SuperSecret1234512345678",
+            "initialValue": None,
+            "message": "0123456789ABCDEF0123456789ABCDEF",
+            "expectedCryptogram": 'e3aafb18e2d0b136ad6f1ef88ae17f70e3aafb18e2d0b136ad6f1ef88ae17f70ce4fefe9f0b28c56f665e9b0220f3dfd',
+        },
+        "CBC2": {
+            "mode": "CBC",
+            "key": "SuperSecret1234512345678",
+            "initialValue": "InitV@rOLength16",
+            "message": "0123456789ABCDEF0123456789ABCDEF",
+            "expectedCryptogram": '1d841be87cb3b9df699f9415a47dbd9857a0c37b10011c544536929fb570ee76b10179e95e441ef4b19bd77a332e2ed6',
+        },
+        "ECB3": {
+            "mode": "ECB",
+            "key": "SuperSecret12345",
+            "initialValue": None,
+            "message": "Some secretive text that needs to be encrypted",
+            "expectedCryptogram": '6c3e288541bca3a5a20056a4653d57470a3a9eb620116af6d46b6081cc8adbb1ff163ddf6f0a23202542b2c059dab5b4',
+        },
+        "CBC3": {
+            "mode": "CBC",
+            "key": "MegaMagicMystery",
+            "initialValue": "16CharV@riable16",
+            "message": "This text is not expected to be compared to anything, therefore it has no expectedCryptogram",
+            "expectedCryptogram": None,
+        },
+        "ECB4": {
+            "mode": "ECB",
+            "key": "SuperSecret1234512345678",
+            "initialValue": None,
+            "message": "",
+            "expectedCryptogram": 'ce4fefe9f0b28c56f665e9b0220f3dfd',
+        },
+        "CBC4": {
+            "mode": "CBC",
+            "key": "SuperSecret1234512345678",
+            "initialValue": "InitVarOLength16",
+            "message": "",
+            "expectedCryptogram": '59ed156f8168e2a29040d627e8643c78',
+        },
+        "CTR": {
+            "mode": "CTR",
+            "key": "SuperSecret1234512345678",
+            "initialValue": "InitVarOLength16",
+            "message": "123456789ABCDEF123456789ABCDEF123456789AB",
+            "expectedCryptogram": '7d0cc60392335d615e0076edb45f26733a63773a83e7725e5c1f5ee5ed5957080f1136417a6719b6bc',
+        },
+        # trusted source: FIPS-197 appendix C (all values in hex format, no padding)
+        "FIPS-197 C.1": {
+            "format": "hex",
+            "mode": "ECB",
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "initialValue": None,
+            "message": '00112233445566778899aabbccddeeff',
+            "expectedCryptogram": '69c4e0d86a7b0430d8cdb78070b4c55a',
+        },
+        "FIPS-197 C.2": {
+            "format": "hex",
+            "mode": "ECB",
+            "key": '000102030405060708090a0b0c0d0e0f1011121314151617',
+            "initialValue": None,
+            "message": '00112233445566778899aabbccddeeff',
+            "expectedCryptogram": 'dda97ca4864cdfe06eaf70a0ec0d7191',
+        },
+        "FIPS-197 C.3": {
+            "format": "hex",
+            "mode": "ECB",
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "initialValue": None,
+            "message": '00112233445566778899aabbccddeeff',
+            "expectedCryptogram": '8ea2b7ca516745bfeafc49904b496089',
+        },
+        # trusted source: NIST SP 800-38A appendix F, four blocks (all values in hex format, no padding)
+        "SP 800-38A F.1.1 ECB-AES128": {
+            "format": "hex",
+            "mode": "ECB",
+            "key": '2b7e151628aed2a6abf7158809cf4f3c',
+            "initialValue": None,
+            "message": '6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e5130c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710',
+            "expectedCryptogram": '3ad77bb40d7a3660a89ecaf32466ef97f5d3d58503b9699de785895a96fdbaaf43b1cd7f598ece23881b00e3ed0306887b0c785e27e8ad3f8223207104725dd4',
+        },
+        "SP 800-38A F.1.3 ECB-AES192": {
+            "format": "hex",
+            "mode": "ECB",
+            "key": '8e73b0f7da0e6452c810f32b809079e562f8ead2522c6b7b',
+            "initialValue": None,
+            "message": '6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e5130c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710',
+            "expectedCryptogram": 'bd334f1d6e45f25ff712a214571fa5cc974104846d0ad3ad7734ecb3ecee4eefef7afd2270e2e60adce0ba2face6444e9a4b41ba738d6c72fb16691603c18e0e',
+        },
+        "SP 800-38A F.1.5 ECB-AES256": {
+            "format": "hex",
+            "mode": "ECB",
+            "key": '603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4',
+            "initialValue": None,
+            "message": '6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e5130c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710',
+            "expectedCryptogram": 'f3eed1bdb5d2a03c064b5a7e3db181f8591ccb10d410ed26dc5ba74a31362870b6ed21b99ca6f4f9f153e7b1beafed1d23304b7a39f9f3ff067d8d8f9e24ecc7',
+        },
+        "SP 800-38A F.2.1 CBC-AES128": {
+            "format": "hex",
+            "mode": "CBC",
+            "key": '2b7e151628aed2a6abf7158809cf4f3c',
+            "initialValue": '000102030405060708090a0b0c0d0e0f',
+            "message": '6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e5130c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710',
+            "expectedCryptogram": '7649abac8119b246cee98e9b12e9197d5086cb9b507219ee95db113a917678b273bed6b8e3c1743b7116e69e222295163ff1caa1681fac09120eca307586e1a7',
+        },
+        "SP 800-38A F.2.3 CBC-AES192": {
+            "format": "hex",
+            "mode": "CBC",
+            "key": '8e73b0f7da0e6452c810f32b809079e562f8ead2522c6b7b',
+            "initialValue": '000102030405060708090a0b0c0d0e0f',
+            "message": '6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e5130c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710',
+            "expectedCryptogram": '4f021db243bc633d7178183a9fa071e8b4d9ada9ad7dedf4e5e738763f69145a571b242012fb7ae07fa9baac3df102e008b0e27988598881d920a9e64f5615cd',
+        },
+        "SP 800-38A F.2.5 CBC-AES256": {
+            "format": "hex",
+            "mode": "CBC",
+            "key": '603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4',
+            "initialValue": '000102030405060708090a0b0c0d0e0f',
+            "message": '6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e5130c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710',
+            "expectedCryptogram": 'f58c4c04d6e5f1ba779eabfb5f7bfbd69cfc4e967edb808d679f777bc6702c7d39f23369a9d9bacfa530e26304231461b2eb05e2c39be9fcda6c19078c6a9d1b',
+        },
+        "TEST NAME": { 
+            "mode": "CBC", 
+            "key": "VALID_SECRET_KEY", 
+            "initialValue": "16_CHAR_LONG_IV_", 
+            "message": "Some message to encrypt", 
+            "expectedCryptogram": None, # optional: 
+     #visit “# trusted source” to quickly obtain a valid expected cryptogram 
+        }, 
+    }
+
+# trusted source: test cases of the GCM specification (McGrew, Viega), used by NIST (all values in hex format):
+    gcmTests = {
+        "Test Case 1": {
+            "key": '00000000000000000000000000000000',
+            "IV": '000000000000000000000000',
+            "message": '',
+            "associatedData": '',
+            "expectedCryptogram": '',
+            "expectedTag": '58e2fccefa7e3061367f1d57a4e7455a',
+        },
+        "Test Case 2": {
+            "key": '00000000000000000000000000000000',
+            "IV": '000000000000000000000000',
+            "message": '00000000000000000000000000000000',
+            "associatedData": '',
+            "expectedCryptogram": '0388dace60b6a392f328c2b971b2fe78',
+            "expectedTag": 'ab6e47d42cec13bdf53a67b21257bddf',
+        },
+        "Test Case 3": {
+            "key": 'feffe9928665731c6d6a8f9467308308',
+            "IV": 'cafebabefacedbaddecaf888',
+            "message": 'd9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a721c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b391aafd255',
+            "associatedData": '',
+            "expectedCryptogram": '42831ec2217774244b7221b784d0d49ce3aa212f2c02a4e035c17e2329aca12e21d514b25466931c7d8f6a5aac84aa051ba30b396a0aac973d58e091473f5985',
+            "expectedTag": '4d5c2af327cd64a62cf35abd2ba6fab4',
+        },
+        "Test Case 4": {
+            "key": 'feffe9928665731c6d6a8f9467308308',
+            "IV": 'cafebabefacedbaddecaf888',
+            "message": 'd9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a721c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b39',
+            "associatedData": 'feedfacedeadbeeffeedfacedeadbeefabaddad2',
+            "expectedCryptogram": '42831ec2217774244b7221b784d0d49ce3aa212f2c02a4e035c17e2329aca12e21d514b25466931c7d8f6a5aac84aa051ba30b396a0aac973d58e091',
+            "expectedTag": '5bc94fbc3221a5db94fae95ae7121a47',
+        },
+        "Test Case 5": {
+            "key": 'feffe9928665731c6d6a8f9467308308',
+            "IV": 'cafebabefacedbad',
+            "message": 'd9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a721c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b39',
+            "associatedData": 'feedfacedeadbeeffeedfacedeadbeefabaddad2',
+            "expectedCryptogram": '61353b4c2806934a777ff51fa22a4755699b2a714fcdc6f83766e5f97b6c742373806900e49f24b22b097544d4896b424989b5e1ebac0f07c23f4598',
+            "expectedTag": '3612d2e79e3b0785561be14aaca2fccb',
+        },
+        "Test Case 6": {
+            "key": 'feffe9928665731c6d6a8f9467308308',
+            "IV": '9313225df88406e555909c5aff5269aa6a7a9538534f7da1e4c303d2a318a728c3c0c95156809539fcf0e2429a6b525416aedbf5a0de6a57a637b39b',
+            "message": 'd9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a721c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b39',
+            "associatedData": 'feedfacedeadbeeffeedfacedeadbeefabaddad2',
+            "expectedCryptogram": '8ce24998625615b603a033aca13fb894be9112a5c3a211a8ba262a3cca7e2ca701e4a9a4fba43c90ccdcb281d48c7c6fd62875d2aca417034c34aee5',
+            "expectedTag": '619cc5aefffe0bfa462af43c1699d050',
+        },
+        "Test Case 13": {
+            "key": '0000000000000000000000000000000000000000000000000000000000000000',
+            "IV": '000000000000000000000000',
+            "message": '',
+            "associatedData": '',
+            "expectedCryptogram": '',
+            "expectedTag": '530f8afbc74536b9a963b4f1c4cb738b',
+        },
+        "Test Case 14": {
+            "key": '0000000000000000000000000000000000000000000000000000000000000000',
+            "IV": '000000000000000000000000',
+            "message": '00000000000000000000000000000000',
+            "associatedData": '',
+            "expectedCryptogram": 'cea7403d4d606b6e074ec5d3baf39d18',
+            "expectedTag": 'd0d1c8a799996bf0265b98b5d48ab919',
+        },
+        "Test Case 15": {
+            "key": 'feffe9928665731c6d6a8f9467308308feffe9928665731c6d6a8f9467308308',
+            "IV": 'cafebabefacedbaddecaf888',
+            "message": 'd9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a721c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b391aafd255',
+            "associatedData": '',
+            "expectedCryptogram": '522dc1f099567d07f47f37a32a84427d643a8cdcbfe5c0c97598a2bd2555d1aa8cb08e48590dbb3da7b08b1056828838c5f61e6393ba7a0abcc9f662898015ad',
+            "expectedTag": 'b094dac5d93471bdec1a502270e3cc6c',
+        },
+        "Test Case 16": {
+            "key": 'feffe9928665731c6d6a8f9467308308feffe9928665731c6d6a8f9467308308',
+            "IV": 'cafebabefacedbaddecaf888',
+            "message": 'd9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a721c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b39',
+            "associatedData": 'feedfacedeadbeeffeedfacedeadbeefabaddad2',
+            "expectedCryptogram": '522dc1f099567d07f47f37a32a84427d643a8cdcbfe5c0c97598a2bd2555d1aa8cb08e48590dbb3da7b08b1056828838c5f61e6393ba7a0abcc9f662',
+            "expectedTag": '76fc6ece0f4e1768cddf8853bb2d551b',
+        },
+    }
+
+# trusted source: test vectors of IEEE 1619 (XTS-AES), key is key 1 followed by key 2 (all values in hex format):
+    xtsTests = {
+        "Vector 1": {
+            "key": '00000000000000000000000000000000' '00000000000000000000000000000000',
+            "sector": 0,
+            "message": '00' * 32,
+            "expectedCryptogram": '917cf69ebd68b2ec9b9fe9a3eadda692cd43d2f59598ed858c02c2652fbf922e',
+        },
+        "Vector 2": {
+            "key": '11111111111111111111111111111111' '22222222222222222222222222222222',
+            "sector": 0x3333333333,
+            "message": '44' * 32,
+            "expectedCryptogram": 'c454185e6a16936e39334038acef838bfb186fff7480adc4289382ecd6d394f0',
+        },
+        "Vector 3": {
+            "key": 'fffefdfcfbfaf9f8f7f6f5f4f3f2f1f0' '22222222222222222222222222222222',
+            "sector": 0x3333333333,
+            "message": '44' * 32,
+            "expectedCryptogram": 'af85336b597afc1a900b2eb21ec949d292df4c047e0b21532186a5971a227a89',
+        },
+        # sectors that do not end at a block boundary (ciphertext stealing) and 256-bit keys,
+        # with the inputs of IEEE 1619 vectors 15-18 and 10 (shortened) and results checked against OpenSSL
+        "Stealing, 17 bytes": {
+            "key": 'fffefdfcfbfaf9f8f7f6f5f4f3f2f1f0' 'bfbebdbcbbbab9b8b7b6b5b4b3b2b1b0',
+            "sector": 0x9a78563412,
+            "message": '000102030405060708090a0b0c0d0e0f10',
+            "expectedCryptogram": '641610679dcbf92e505c41333fb06c2a95',
+        },
+        "Stealing, 18 bytes": {
+            "key": 'fffefdfcfbfaf9f8f7f6f5f4f3f2f1f0' 'bfbebdbcbbbab9b8b7b6b5b4b3b2b1b0',
+            "sector": 0x9a78563412,
+            "message": '000102030405060708090a0b0c0d0e0f1011',
+            "expectedCryptogram": '223a725cbcd4dc647b9a9826d54c99c895c8',
+        },
+        "Stealing, 19 bytes": {
+            "key": 'fffefdfcfbfaf9f8f7f6f5f4f3f2f1f0' 'bfbebdbcbbbab9b8b7b6b5b4b3b2b1b0',
+            "sector": 0x9a78563412,
+            "message": '000102030405060708090a0b0c0d0e0f101112',
+            "expectedCryptogram": '0d39809a65c1d55501960b671d4b8b6b95c871',
+        },
+        "Stealing, 20 bytes": {
+            "key": 'fffefdfcfbfaf9f8f7f6f5f4f3f2f1f0' 'bfbebdbcbbbab9b8b7b6b5b4b3b2b1b0',
+            "sector": 0x9a78563412,
+            "message": '000102030405060708090a0b0c0d0e0f10111213',
+            "expectedCryptogram": 'a8ba0048d75084603eb8423a09b7bf7595c871f6',
+        },
+        "XTS-AES-256, 67 bytes": {
+            "key": '2718281828459045235360287471352662497757247093699959574966967627' '3141592653589793238462643383279502884197169399375105820974944592',
+            "sector": 0xff,
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f202122232425262728292a2b2c2d2e2f303132333435363738393a3b3c3d3e3f000102',
+            "expectedCryptogram": '1c3b3a102f770386e4836c99e370cf9bea00803f5e482357a4ae12d414a3e63b5d31e276f8fe4a8d66b317f9ac683f44a8f8d036626235af89a3185455055fe6680a86',
+        },
+    }
+
+# trusted source: results checked against OpenSSL (all values in hex format, CBC and ECB with PKCS#7 padding).
+# the message is fed to the contexts in pieces of chunkLengths bytes, taken in turn
+    incrementalTests = {
+        "ECB, 50 bytes": {
+            "mode": 'ECB',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": None,
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f202122232425262728292a2b2c2d2e2f3031',
+            "chunkLengths": [1, 7, 15, 17],
+            "expectedCryptogram": '0a940bb5416ef045f1c39458c653ea5a07feef74e1d5036e900eee118e9492935be87e2e5b447c944b21c9af7756c0d83f12bb5afac6a34ffb9078ecc8899419',
+        },
+        "CBC-192, 50 bytes": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f1011121314151617',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f202122232425262728292a2b2c2d2e2f3031',
+            "chunkLengths": [3, 13, 33],
+            "expectedCryptogram": '8109f00b4324e87d610d74c4e2ca931c682ca0dc59afb401b0c88076930072a4028a66bd8a30ca9804e8086fc7c72a5e1f98b1ccdcc81a34aa7fd658981b62f8',
+        },
+        "CTR-256, 50 bytes": {
+            "mode": 'CTR',
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f202122232425262728292a2b2c2d2e2f3031',
+            "chunkLengths": [5, 11, 1, 19],
+            "expectedCryptogram": '9201cf8e279386cc5260ec5f4c3f6d1bda4e6953e53f22d676be4f3a566a9891b94d0378303dd3bf50ac0a3bb979dca07959',
+        },
+        "GCM, 50 bytes": {
+            "mode": 'GCM',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'cafebabefacedbaddecaf888',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f202122232425262728292a2b2c2d2e2f3031',
+            "associatedData": 'feedfacedeadbeef',
+            "chunkLengths": [7, 9, 21],
+            "expectedCryptogram": '8978c5b581f28706a219c38351f7aee8961a2a374ffea6b229f00c606a3af3ceba08bb23d6313b5be5669a17af89e514fcdf',
+            "expectedTag": '573ac1d4be1fe5788c0e3b25ee9d553a',
+        },
+    }
+
+# trusted source: results checked against OpenSSL (all values in hex format).
+# inPlace - the message is encrypted and decrypted in its own buffer (out is data)
+    outputTests = {
+        "CBC into a buffer": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f2021222324252627',
+            "padding": True,
+            "inPlace": False,
+            "expectedCryptogram": '753d5eacf88ed4c2c30496112e5f2221380449120c43e61d91c66cae5065cdad9a1e0a79d056704b5b78b3bc3b475987',
+        },
+        "CBC in place, padded": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f2021222324252627',
+            "padding": True,
+            "inPlace": True,
+            "expectedCryptogram": '753d5eacf88ed4c2c30496112e5f2221380449120c43e61d91c66cae5065cdad9a1e0a79d056704b5b78b3bc3b475987',
+        },
+        "ECB-256 in place, whole blocks": {
+            "mode": 'ECB',
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "IV": None,
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f202122232425262728292a2b2c2d2e2f',
+            "padding": False,
+            "inPlace": True,
+            "expectedCryptogram": '5a6e045708fb7196f02e553d02c3a692e9c3ef8ab23453e6f0749cd636e7a88e61a6936e4e8f101c1cc1f993b542a0d4',
+        },
+        "CTR in place": {
+            "mode": 'CTR',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f2021222324252627',
+            "padding": False,
+            "inPlace": True,
+            "expectedCryptogram": '66a6c5eb3057374f9f58d40c3f1ba3a2a290c513a38b2ababcb469a0728101f5f250b075587ecdba',
+        },
+        "GCM-256 into a buffer": {
+            "mode": 'GCM',
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "IV": 'cafebabefacedbaddecaf888',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f2021222324252627',
+            "associatedData": 'feedfacedeadbeef',
+            "padding": False,
+            "inPlace": False,
+            "expectedCryptogram": '8aa2a225ae7f491c4e0257d6771087301d31d242cb0c7c6356c61e6aa2947be08d71e365e5f16f45',
+            "expectedTag": '5ffd8c3599bc8f24a5586d8e496cbc97',
+        },
+        "GCM-256 in place": {
+            "mode": 'GCM',
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "IV": 'cafebabefacedbaddecaf888',
+            "message": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f2021222324252627',
+            "associatedData": 'feedfacedeadbeef',
+            "padding": False,
+            "inPlace": True,
+            "expectedCryptogram": '8aa2a225ae7f491c4e0257d6771087301d31d242cb0c7c6356c61e6aa2947be08d71e365e5f16f45',
+            "expectedTag": '5ffd8c3599bc8f24a5586d8e496cbc97',
+        },
+    }
+
+# the message is messageLength bytes 0, 1, ... 250, 0, 1... and the results are compared with the ones
+# of the one-shot functions (checked above). source 'iterator' gives the input in pieces of pieceLengths bytes
+    streamTests = {
+        "CBC, StreamReader": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "messageLength": 5000,
+            "source": 'reader',
+            "chunkLength": 1000,
+            "offloadLength": 512,
+        },
+        "CTR-192, async iterator": {
+            "mode": 'CTR',
+            "key": '000102030405060708090a0b0c0d0e0f1011121314151617',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "messageLength": 5003,
+            "source": 'iterator',
+            "pieceLengths": [700, 3, 2500],
+            "chunkLength": 1000,
+            "offloadLength": 512,
+        },
+        "GCM-256, async iterator": {
+            "mode": 'GCM',
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "IV": 'cafebabefacedbaddecaf888',
+            "associatedData": 'feedfacedeadbeef',
+            "messageLength": 4099,
+            "source": 'iterator',
+            "pieceLengths": [17, 1500],
+            "chunkLength": 1024,
+            "offloadLength": 600,
+        },
+    }
+
+# message i of messageCount is bytes i, i + 1... (as long as the i-th of messageLengths, taken in turn), each with
+# its own key of the i-th of keyLengths (one key for all messages if only one length is given) and IV
+    laneTests = {
+        "numpy, mixed key lengths": {
+            "messageCount": 40,
+            "messageLengths": [0, 1, 15, 16, 17, 33, 64],
+            "keyLengths": [16, 24, 32],
+            "useNumpy": True,
+            "useBitslice": False,
+        },
+        "bitslice, mixed key lengths": {
+            "messageCount": 130,
+            "messageLengths": [0, 1, 15, 16, 17, 33, 64],
+            "keyLengths": [16, 24, 32],
+            "useNumpy": False,
+            "useBitslice": True,
+        },
+        "bitslice, one key, empty messages": {
+            "messageCount": 128,
+            "messageLengths": [0, 0, 31],
+            "keyLengths": [32],
+            "useNumpy": False,
+            "useBitslice": True,
+        },
+        "serial, mixed key lengths": {
+            "messageCount": 12,
+            "messageLengths": [0, 5, 48],
+            "keyLengths": [32, 16, 24],
+            "useNumpy": False,
+            "useBitslice": False,
+        },
+    }
+
+# the file is windows whole windows and extraLength bytes (0, 1, ... 250, 0, 1...), the results are compared with
+# the ones of the one-shot functions (checked above)
+    fileTests = {
+        "CBC, into another file": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "windows": 2,
+            "extraLength": 100,
+            "inPlace": False,
+        },
+        "CBC-256, in place, padding in a new window": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "windows": 2,
+            "extraLength": 0,
+            "inPlace": True,
+        },
+        "ECB-192, in place": {
+            "mode": 'ECB',
+            "key": '000102030405060708090a0b0c0d0e0f1011121314151617',
+            "IV": None,
+            "windows": 1,
+            "extraLength": 4001,
+            "inPlace": True,
+        },
+        "CTR, into another file": {
+            "mode": 'CTR',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "windows": 2,
+            "extraLength": 7,
+            "inPlace": False,
+        },
+    }
+
+# the message is messageLength bytes 0, 1, ... 250, 0, 1..., every range [start, length] must decrypt to message[start:start + length]
+    rangeTests = {
+        "CBC, padding in the last block": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "messageLength": 50,
+            "padding": True,
+            "ranges": [[0, 16], [16, 16], [15, 2], [0, 1], [31, 1], [32, 18], [48, 2], [48, 10], [40, 100], [0, 50], [0, 64], [49, 1], [50, 5], [60, 5], [0, 0], [20, 0]],
+        },
+        "CBC-256, a whole block of padding": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "messageLength": 48,
+            "padding": True,
+            "ranges": [[32, 16], [47, 1], [32, 17], [48, 16], [47, 100], [0, 48], [16, 1000]],
+        },
+        "CBC, empty message": {
+            "mode": 'CBC',
+            "key": '000102030405060708090a0b0c0d0e0f',
+            "IV": 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff',
+            "messageLength": 0,
+            "padding": True,
+            "ranges": [[0, 0], [0, 16], [5, 3]],
+        },
+        "ECB-192, without padding": {
+            "mode": 'ECB',
+            "key": '000102030405060708090a0b0c0d0e0f1011121314151617',
+            "IV": None,
+            "messageLength": 64,
+            "padding": False,
+            "ranges": [[0, 64], [16, 32], [17, 30], [63, 1], [63, 10], [64, 1]],
+        },
+    }
+
+class AES:
+    # the expanded key and the state of the block being processed are kept on the instance
+    # (not shared by the class), so threads are safe as long as each uses its own AES object
+    __slots__ = ('expKey', 'state')
+
+    def AESEncrypt(self, message, key):
+
+        # key expansion step - make a long, divided key form single input key
+        return self.AESEncryptWithSchedule(message, AESKeySchedule(key))
+
+    def AESEncryptWithSchedule(self, message, schedule):
+        # same as AESEncrypt, but the key is already expanded
+        # (so that a message of many blocks expands its key only once)
+        self.expKey = schedule.expKey
+
+        # bytearray type because byte strings can't be modified
+        self.state = bytearray(message)
+
+        # initial transformation - 0th round key addition
+        self.AESAddRoundKey(0)
+
+        # how many rounds do we need
+        MaxRounds = schedule.rounds
+
+        # main loop that goes through all the rounds but the last one
+        for round in range(1, MaxRounds):
+            self.AESSubBytes(0)
+            self.AESShiftRows(0)
+            self.AESMixColumns(0)
+            self.AESAddRoundKey(round)
+
+        # the last round
+        round += 1
+        self.AESSubBytes(0)
+        self.AESShiftRows(0)
+        self.AESAddRoundKey(round)
+
+        # return ciphertext in the same type that input was received
+        return bytes(self.state)
+
+    def AESDecrypt(self, cryptogram, key):
+        # key expansion step - make a long, divided key form single input key
+        # the same expanded key is used in encryption and decryption
+        return self.AESDecryptWithSchedule(cryptogram, AESKeySchedule(key))
+
+    def AESDecryptWithSchedule(self, cryptogram, schedule):
+        # same as AESDecrypt, but the key is already expanded
+        self.expKey = schedule.expKey
+
+        # bytearray type because byte strings can't be modified
+        self.state = bytearray(cryptogram)
+
+        # how many rounds do we need
+        MaxRounds = schedule.rounds
+
+        # initial transformation - MaxRounds-th round key addition
+        # the round keys are added in reverse order on decryption
+        self.AESAddRoundKey(MaxRounds)
+
+        # main loop that goes through all the rounds but the last one
+        # also backwards so that MixColumns takes correct parameter
+        # since the function does not change for decryption
+        for round in range(MaxRounds-1, 0, -1):
+            self.AESShiftRows(1)
+            self.AESSubBytes(1)
+            self.AESAddRoundKey(round)
+            self.AESMixColumns(1)
+
+        # last round, 0th round key
+        round -= 1
+        self.AESShiftRows(1)
+        self.AESSubBytes(1)
+        self.AESAddRoundKey(round)
+
+        # return ciphertext in the same type that input was received
+        return bytes(self.state)
+
+    def AESKeyExpansion(self, key, legacy = False):
+        # legacy = True - the AES-256 schedule of versions before CTR mode (see AESKeySchedule)
+
+        # split the key into list of words (4 bytes)
+        keyRound = [key[i:i + 4] for i in range(0, len(key), 4)]
+
+        # The first n bytes of the expanded key are simply the encryption key.
+        # extKey indexes == rounds of expansion (not AES rounds!)
+        extKey = []
+        extKey.append(keyRound)
+        round =0
+        wordCount = len(keyRound) # how many words extKey holds so far
+
+        # how many words should the extended key have
+        n = len(key)
+        b = 44 if n == 16 else 52 if n == 24 else 60
+        n = n//4
+        sBox = AES_Tables.s_box
+
+        # a double loop since extKey is a 2d list
+        # this one appends rounds of words to extKey
+        # (number of rounds depends on original key size)
+        # until length of extended key is enough
+        while wordCount < b :
+            round += 1
+            temp = extKey[round - 1][-1] #last of each word is used in first of next word
+            keyRound = [] # holds words
+
+            # this one adds words to keyRound
+            for i in range (0, n):
+
+                if i == 0:
+                    # rotate the word 1 time
+                    temp = rotateWord(temp, 1)
+
+                    # substitute each byte using the sbox
+                    temp = [sBox[i] for i in temp]
+
+                    # xor the first byte of temp with rcon(round)
+                    temp[0] ^= AES_Tables.rcon[round]
+
+                elif n == 8 and i == 4 and not legacy:
+                    # 256-bit keys: the middle word of a round is substituted too
+                    temp = [sBox[b] for b in temp]
+
+                # word n in a round = word n from previous round XOR temp
+                # temp is either a transformed last word of previous round,
+                # if this is first word of a round,
+                # or just previous word in a round
+                keyRound.append(sxor(temp, extKey[round-1][i] ))
+
+                # this word in a round is used for next word
+                temp = keyRound[-1]
+
+            extKey.append(keyRound)
+            wordCount += len(keyRound)
+
+        # turn extKey into one big list then split into 4-word rounds used for AES encryption
+        extKey = [word for keyRound in extKey for word in keyRound]
+        extKey = [extKey[i:i + 4] for i in range(0, len(extKey), 4)]
+
+        return extKey
+
+    def AESSubBytes(self, isInverse):
+        # substitutes a byte in the state with a corresponding byte in the s_box.
+        # this, unlike what is specified in the theory, does not determine the corresponding
+        # byte by looking at bits;
+        # instead, s_box is just a 1-dimensional array, with decimal numbers,
+        # and the decimal value of the byte is passed as index for s_box.
+        # this achieves the same result but is much easier to do.
+        sBox = AES_Tables.s_box; invSBox = AES_Tables.inv_s_box
+        if isInverse == 0 : self.state = bytearray([sBox[i] for i in self.state])
+        else: self.state = bytearray([invSBox[i] for i in self.state])
+
+    def AESShiftRows(self, isInverse):
+        # divide the state into rows
+        temp = [self.state[i::4] for i in range(0, 4)]
+
+        # shift each row. row 0 by 0 places, row 1 by 1, etc
+        # to the left when encrypting, to the right when decrypting
+        if isInverse == 0:
+            for i in range(0, 4): temp[i] = rotateWord(temp[i], i)
+        else:
+            for i in range(0, 4): temp[i] = rotateWord(temp[i], -i)
+
+        # join the rows back into the state byte array
+        temp = b''.join(temp)
+        temp = [temp[i::4] for i in range(0, 4)]
+        self.state = bytearray(b''.join(temp))
+
+    def AESMixColumns(self, isInverse):
+        # divide the state into columns
+        temp = [[0]*4 for i in range(4)]
+        tempState = [list(self.state[i:i + 4]) for i in range(0, 16, 4)]
+
+        # use the correct matrix depending on if encrypting or decrypting
+        if isInverse == 0: matrix = AES_Tables.MixColumnMatrix
+        else: matrix = AES_Tables.MixColumnMatrixInv
+        galMul2 = AES_Tables.galMul2; galMul3 = AES_Tables.galMul3; galMul9 = AES_Tables.galMul9
+        galMul11 = AES_Tables.galMul11; galMul13 = AES_Tables.galMul13; galMul14 = AES_Tables.galMul14
+
+        # multiplication of each column of the state by the matrix.
+        # it functions similarly to normal matrix multiplication, but the addition is XOR,
+        # and multiplication is multiplication in finite field GF(2^8).
+        # however, this function uses a method which is easier to program.
+        # Since the matrix and the field are constant, we know the result of multiplication
+        # for any byte- so it's possible to create lookup tables for each value from the matrix.
+        # then, to get the value of a byte, it is enough to look up the result of multiplication
+        # in the correct table, then xor the 4 values in the corresponding row together.
+        for i in range(4):
+            for j in range(4):
+                for k in range(4):
+                    if matrix[j][k] == 2: temp[i][j] ^= galMul2[tempState[i][k]]
+                    elif matrix[j][k] == 3: temp[i][j] ^= galMul3[tempState[i][k]]
+                    elif matrix[j][k] == 9: temp[i][j] ^= galMul9[tempState[i][k]]
+                    elif matrix[j][k] == 11: temp[i][j] ^= galMul11[tempState[i][k]]
+                    elif matrix[j][k] == 13: temp[i][j] ^= galMul13[tempState[i][k]]
+                    elif matrix[j][k] == 14: temp[i][j] ^= galMul14[tempState[i][k]]
+                    else: temp[i][j] ^= tempState[i][k]
+
+        self.state = bytearray(sum(temp, []))
+
+    def AESAddRoundKey(self, round):
+        # concatenates the key so its just a 16 byte string
+        # then xors with corresponding byte from round key
+        keyRound = b''.join(self.expKey[round])
+        for i in range(0, 16): self.state[i] ^= keyRound[i]
+
+class AESKeySchedule:
+    # the expanded form of a single key, computed once and then reused
+    # for every block (and every message) encrypted with that key
+
+    # legacy = True expands 256-bit keys like versions before CTR mode did (without SubWord of word 4
+    # of every round, not AES), only to decrypt what they encrypted; 128- and 192-bit keys are not affected
+
+    def __init__(self, key, legacy = False):
+        self.key = bytes(key)
+        self.legacy = legacy
+        n = len(self.key)
+        if n not in (16, 24, 32):
+            raise ValueError("Key of unsupported length: {} bytes (expected 16, 24 or 32)".format(n))
+        # how many rounds the cipher does with this key
+        self.rounds = 10 if n == 16 else 12 if n == 24 else 14
+        # rounds of 4 words each, in the layout AES.AESAddRoundKey expects
+        self.expKey = AES().AESKeyExpansion(self.key, legacy)
+        # multiples of H for GHASH (GCM mode), made by AESGHASH when this key is first used with GCM
+        self.ghashTable = None
+        # round keys in bitsliced form, made by AESBitslice when this key is first used with it
+        self.bitslicedKeys = None
+        # round keys concatenated into 16 byte strings
+        # (expKey may end with a few words more than the cipher uses)
+        self.roundKeys = [b''.join(keyRound) for keyRound in self.expKey[:self.rounds + 1]]
+        # the same round keys as 32-bit words (one word per column), used by AESTTable
+        self.encWords = [int.from_bytes(word, 'big') for keyRound in self.expKey[:self.rounds + 1] for word in keyRound]
+        # round keys of the equivalent inverse cipher: reversed order and
+        # InvMixColumns applied to all but the first and the last one
+        self.decWords = []
+        sBox = AES_Tables.s_box
+        Td0 = AES_Tables.Td0; Td1 = AES_Tables.Td1; Td2 = AES_Tables.Td2; Td3 = AES_Tables.Td3
+        for round in range(self.rounds, -1, -1):
+            keyRound = self.encWords[4 * round:4 * round + 4]
+            if 0 < round < self.rounds:
+                keyRound = [Td0[sBox[w >> 24]] ^ Td1[sBox[(w >> 16) & 255]] ^ Td2[sBox[(w >> 8) & 255]] ^ Td3[sBox[w & 255]] for w in keyRound]
+            self.decWords += keyRound
+
+class AESKeyScheduleCache:
+    # bounded LRU cache of key schedules, keyed by the key bytes (and whether the schedule is legacy),
+    # so that keys used again and again are only expanded once
+
+    def __init__(self, maxSize = 512):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.schedules = OrderedDict()
+        self.lock = threading.Lock() # the cache is shared by all threads of the program
+
+    def GetSchedule(self, key, legacy = False):
+        # an already expanded key is used as it is
+        if isinstance(key, AESKeySchedule): return key
+        cacheKey = (bytes(key), legacy)
+        with self.lock:
+            schedule = self.schedules.get(cacheKey)
+            if schedule is not None:
+                self.hits += 1
+                self.schedules.move_to_end(cacheKey) # mark as most recently used
+                return schedule
+            self.misses += 1
+        # expand outside of the lock, expansion is the slow part
+        schedule = AESKeySchedule(cacheKey[0], legacy)
+        with self.lock:
+            self.schedules[cacheKey] = schedule
+            # forget the least recently used keys
+            while len(self.schedules) > self.maxSize:
+                self.schedules.popitem(last = False)
+        return schedule
+
+    def Stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.schedules), "maxSize": self.maxSize}
+
+    def Clear(self):
+        with self.lock:
+            self.schedules.clear()
+            self.hits = 0
+            self.misses = 0
+
+# key schedules shared by every AES_Program
+keyScheduleCache = AESKeyScheduleCache()
+
+class AESTTable:
+    # the same cipher as AES, but each round works on four 32-bit column words:
+    # SubBytes, ShiftRows and MixColumns of a column are merged into 4 lookups
+    # in the precomputed Te0-Te3 tables (Td0-Td3 for decryption), and
+    # AddRoundKey is a xor with one round key word.
+    # the state lives in local variables, so no arrays are allocated per round
+
+    def AESEncrypt(self, message, key):
+        return self.AESEncryptWithSchedule(message, AESKeySchedule(key))
+
+    def AESDecrypt(self, cryptogram, key):
+        return self.AESDecryptWithSchedule(cryptogram, AESKeySchedule(key))
+
+    def AESEncryptWithSchedule(self, message, schedule):
+        return blockWords.pack(*self.AESEncryptWords(*blockWords.unpack(message), schedule))
+
+    def AESDecryptWithSchedule(self, cryptogram, schedule):
+        return blockWords.pack(*self.AESDecryptWords(*blockWords.unpack(cryptogram), schedule))
+
+    def AESEncryptWords(self, s0, s1, s2, s3, schedule):
+        # encrypt a block given as its 4 column words, returns the 4 column words of the result
+        rk = schedule.encWords
+        te0 = AES_Tables.Te0; te1 = AES_Tables.Te1; te2 = AES_Tables.Te2; te3 = AES_Tables.Te3
+        # add the 0th round key
+        s0 ^= rk[0]; s1 ^= rk[1]; s2 ^= rk[2]; s3 ^= rk[3]
+        # all the rounds but the last one
+        # (ShiftRows is done by taking row r of a column from column + r)
+        for i in range(4, 4 * schedule.rounds, 4):
+            t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 255] ^ te2[(s2 >> 8) & 255] ^ te3[s3 & 255] ^ rk[i]
+            t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 255] ^ te2[(s3 >> 8) & 255] ^ te3[s0 & 255] ^ rk[i + 1]
+            t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 255] ^ te2[(s0 >> 8) & 255] ^ te3[s1 & 255] ^ rk[i + 2]
+            s3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 255] ^ te2[(s1 >> 8) & 255] ^ te3[s2 & 255] ^ rk[i + 3]
+            s0 = t0; s1 = t1; s2 = t2
+        # the last round has no MixColumns, so plain s_box is used
+        i = 4 * schedule.rounds
+        sb = AES_Tables.s_box
+        return (
+            ((sb[s0 >> 24] << 24) | (sb[(s1 >> 16) & 255] << 16) | (sb[(s2 >> 8) & 255] << 8) | sb[s3 & 255]) ^ rk[i],
+            ((sb[s1 >> 24] << 24) | (sb[(s2 >> 16) & 255] << 16) | (sb[(s3 >> 8) & 255] << 8) | sb[s0 & 255]) ^ rk[i + 1],
+            ((sb[s2 >> 24] << 24) | (sb[(s3 >> 16) & 255] << 16) | (sb[(s0 >> 8) & 255] << 8) | sb[s1 & 255]) ^ rk[i + 2],
+            ((sb[s3 >> 24] << 24) | (sb[(s0 >> 16) & 255] << 16) | (sb[(s1 >> 8) & 255] << 8) | sb[s2 & 255]) ^ rk[i + 3])
+
+    def AESDecryptWords(self, s0, s1, s2, s3, schedule):
+        # equivalent inverse cipher: the same structure as encryption,
+        # with Td tables and the round keys from schedule.decWords
+        rk = schedule.decWords
+        td0 = AES_Tables.Td0; td1 = AES_Tables.Td1; td2 = AES_Tables.Td2; td3 = AES_Tables.Td3
+        s0 ^= rk[0]; s1 ^= rk[1]; s2 ^= rk[2]; s3 ^= rk[3]
+        # InvShiftRows takes row r of a column from column - r
+        for i in range(4, 4 * schedule.rounds, 4):
+            t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 255] ^ td2[(s2 >> 8) & 255] ^ td3[s1 & 255] ^ rk[i]
+            t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 255] ^ td2[(s3 >> 8) & 255] ^ td3[s2 & 255] ^ rk[i + 1]
+            t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 255] ^ td2[(s0 >> 8) & 255] ^ td3[s3 & 255] ^ rk[i + 2]
+            s3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 255] ^ td2[(s1 >> 8) & 255] ^ td3[s0 & 255] ^ rk[i + 3]
+            s0 = t0; s1 = t1; s2 = t2
+        # the last round has no InvMixColumns, so plain inv_s_box is used
+        i = 4 * schedule.rounds
+        isb = AES_Tables.inv_s_box
+        return (
+            ((isb[s0 >> 24] << 24) | (isb[(s3 >> 16) & 255] << 16) | (isb[(s2 >> 8) & 255] << 8) | isb[s1 & 255]) ^ rk[i],
+            ((isb[s1 >> 24] << 24) | (isb[(s0 >> 16) & 255] << 16) | (isb[(s3 >> 8) & 255] << 8) | isb[s2 & 255]) ^ rk[i + 1],
+            ((isb[s2 >> 24] << 24) | (isb[(s1 >> 16) & 255] << 16) | (isb[(s0 >> 8) & 255] << 8) | isb[s3 & 255]) ^ rk[i + 2],
+            ((isb[s3 >> 24] << 24) | (isb[(s2 >> 16) & 255] << 16) | (isb[(s1 >> 8) & 255] << 8) | isb[s0 & 255]) ^ rk[i + 3])
+
+    def AESCryptBlocksInPlace(self, buffer, schedule, operation, IV = None):
+        # run operation ('ECB-encrypt', 'ECB-decrypt', 'CBC-encrypt' or 'CBC-decrypt') on
+        # the whole blocks of the writable buffer, overwriting them with the result.
+        # words are read and written directly in the buffer, no objects are made per block
+        unpack = blockWords.unpack_from
+        pack = blockWords.pack_into
+        encrypt = self.AESEncryptWords
+        decrypt = self.AESDecryptWords
+        end = len(buffer) - len(buffer) % 16
+        if operation == 'ECB-encrypt':
+            for offset in range(0, end, 16):
+                pack(buffer, offset, *encrypt(*unpack(buffer, offset), schedule))
+        elif operation == 'ECB-decrypt':
+            for offset in range(0, end, 16):
+                pack(buffer, offset, *decrypt(*unpack(buffer, offset), schedule))
+        elif operation == 'CBC-encrypt':
+            p0, p1, p2, p3 = blockWords.unpack(IV)
+            for offset in range(0, end, 16):
+                m0, m1, m2, m3 = unpack(buffer, offset)
+                p0, p1, p2, p3 = encrypt(m0 ^ p0, m1 ^ p1, m2 ^ p2, m3 ^ p3, schedule)
+                pack(buffer, offset, p0, p1, p2, p3)
+        else:
+            p0, p1, p2, p3 = blockWords.unpack(IV)
+            for offset in range(0, end, 16):
+                c0, c1, c2, c3 = unpack(buffer, offset)
+                m0, m1, m2, m3 = decrypt(c0, c1, c2, c3, schedule)
+                pack(buffer, offset, m0 ^ p0, m1 ^ p1, m2 ^ p2, m3 ^ p3)
+                p0 = c0; p1 = c1; p2 = c2; p3 = c3
+
+# the block cipher used by AES_Program modes
+
+class AESNumpy:
+    # the same cipher as AES, applied to a whole batch of blocks at once:
+    # the blocks are rows of an (N, 16) uint8 array, every round function
+    # is a single fancy-indexed lookup or xor over the whole array.
+    # needs numpy (see AES_Program.useNumpy)
+
+    batchBlocks = 1 << 16 # blocks processed together, bounds the size of temporary arrays
+    tables = None # numpy copies of s_box, inv_s_box and galMul tables, made on first use
+
+    def __init__(self):
+        LoadNumpy()
+        if AESNumpy.tables is None:
+            AESNumpy.tables = self.MakeTables()
+        self.tables = AESNumpy.tables
+
+    def MakeTables(self):
+        tables = {}
+        tables['sBox'] = numpy.frombuffer(AES_Tables.s_box, dtype = numpy.uint8)
+        tables['invSBox'] = numpy.frombuffer(AES_Tables.inv_s_box, dtype = numpy.uint8)
+        # multiplication tables indexed by the MixColumnMatrix entries (1 needs no table)
+        tables['mul'] = {n: numpy.frombuffer(getattr(AES_Tables, 'galMul{}'.format(n)), dtype = numpy.uint8) for n in (2, 3, 9, 11, 13, 14)}
+        # byte i of the shifted state comes from byte shiftRows[i] of the state (column-major, like AES.state)
+        tables['shiftRows'] = numpy.array([4 * ((i // 4 + i % 4) % 4) + i % 4 for i in range(16)])
+        tables['invShiftRows'] = numpy.array([4 * ((i // 4 - i % 4) % 4) + i % 4 for i in range(16)])
+        return tables
+
+    def RoundKeys(self, schedule):
+        # (rounds + 1, 16) array of round keys
+        return numpy.frombuffer(b''.join(schedule.roundKeys), dtype = numpy.uint8).reshape(-1, 16)
+
+    def AESEncryptBlocks(self, blocks, schedule):
+        # blocks is an (N, 16) uint8 array, returns a new array of encrypted blocks
+        return self.AESEncryptRounds(blocks, self.RoundKeys(schedule), schedule.rounds)
+
+    def AESEncryptRounds(self, blocks, roundKeys, rounds):
+        # roundKeys[round] is xored into the state after each round: a (16,) round key
+        # for all blocks, or an (N, 16) array with a round key for each block (lanes with different keys)
+        sBox = self.tables['sBox']
+        shiftRows = self.tables['shiftRows']
+        state = blocks ^ roundKeys[0]
+        for round in range(1, rounds):
+            # SubBytes and ShiftRows in one lookup
+            state = sBox[state[:, shiftRows]]
+            state = self.AESMixColumns(state, AES_Tables.MixColumnMatrix)
+            state ^= roundKeys[round]
+        state = sBox[state[:, shiftRows]]
+        state ^= roundKeys[rounds]
+        return state
+
+    def AESDecryptBlocks(self, blocks, schedule):
+        # blocks is an (N, 16) uint8 array, returns a new array of decrypted blocks
+        roundKeys = self.RoundKeys(schedule)
+        invSBox = self.tables['invSBox']
+        invShiftRows = self.tables['invShiftRows']
+        state = blocks ^ roundKeys[schedule.rounds]
+        for round in range(schedule.rounds - 1, 0, -1):
+            state = invSBox[state[:, invShiftRows]]
+            state ^= roundKeys[round]
+            state = self.AESMixColumns(state, AES_Tables.MixColumnMatrixInv)
+        state = invSBox[state[:, invShiftRows]]
+        state ^= roundKeys[0]
+        return state
+
+    def AESMixColumns(self, state, matrix):
+        # the same matrix multiplication as AES.AESMixColumns, done for
+        # every column of every block at once; state is column-major,
+        # so columns[:, i, k] is byte k of column i
+        columns = state.reshape(-1, 4, 4)
+        mul = self.tables['mul']
+        result = numpy.empty_like(columns)
+        for j in range(4):
+            row = None
+            for k in range(4):
+                term = columns[:, :, k] if matrix[j][k] == 1 else mul[matrix[j][k]][columns[:, :, k]]
+                row = term if row is None else row ^ term
+            result[:, :, j] = row
+        return result.reshape(-1, 16)
+
+    def AESCryptBlocksInPlace(self, view, schedule, operation, IV = None):
+        # run operation ('ECB-encrypt', 'ECB-decrypt' or 'CBC-decrypt') on the whole blocks
+        # of the writable buffer view, batchBlocks blocks at once
+        blocks = numpy.frombuffer(view, dtype = numpy.uint8)[:len(view) - len(view) % 16].reshape(-1, 16)
+        for i in range(0, len(blocks), self.batchBlocks):
+            batch = blocks[i:i + self.batchBlocks]
+            if operation == 'ECB-encrypt':
+                batch[:] = self.AESEncryptBlocks(batch, schedule)
+            elif operation == 'ECB-decrypt':
+                batch[:] = self.AESDecryptBlocks(batch, schedule)
+            else:
+                # message block i = decrypted block i xor cryptogram block i - 1 (the IV for block 0)
+                nextIV = batch[-1].tobytes()
+                result = self.AESDecryptBlocks(batch, schedule)
+                result[0] ^= numpy.frombuffer(bytes(IV), dtype = numpy.uint8)
+                result[1:] ^= batch[:-1]
+                batch[:] = result
+                IV = nextIV
+
+    def AESEncryptLanesCBC(self, buffer, starts, lengths, schedules, IVs):
+        # CBC encryption of many messages in the writable buffer, in place: message i takes lengths[i] bytes
+        # (a multiple of 16) from starts[i] and is encrypted with schedules[i] and IVs[i].
+        # step j encrypts block j of every message that has one, all in one AESEncryptRounds call
+        blocks = numpy.frombuffer(buffer, dtype = numpy.uint8).reshape(-1, 16)
+        # lanes of different key lengths do not have the same number of rounds, so they run separately
+        for rounds in sorted(set(schedule.rounds for schedule in schedules)):
+            lanes = [i for i in range(len(schedules)) if schedules[i].rounds == rounds]
+            # longest messages first - the lanes still running at step j are always the first ones
+            lanes.sort(key = lambda i: -lengths[i])
+            for first in range(0, len(lanes), self.batchBlocks):
+                self.AESEncryptLanes(blocks, [lanes[i] for i in range(first, min(first + self.batchBlocks, len(lanes)))],
+                                     starts, lengths, schedules, IVs, rounds)
+
+    def AESEncryptLanes(self, blocks, lanes, starts, lengths, schedules, IVs, rounds):
+        laneStarts = numpy.array([starts[i] // 16 for i in lanes], dtype = numpy.intp)
+        laneBlocks = [lengths[i] // 16 for i in lanes]
+        # round keys of each lane as a (rounds + 1, lanes, 16) array, every distinct key converted once
+        keyIndexes = {}
+        for i in lanes: keyIndexes.setdefault(id(schedules[i]), (len(keyIndexes), schedules[i]))
+        keys = numpy.stack([self.RoundKeys(schedule) for index, schedule in keyIndexes.values()])
+        laneKeys = numpy.array([keyIndexes[id(schedules[i])][0] for i in lanes], dtype = numpy.intp)
+        roundKeys = numpy.ascontiguousarray(keys[laneKeys].transpose(1, 0, 2))
+        # latest cryptogram block of each lane
+        chain = numpy.frombuffer(b''.join(bytes(IVs[i]) for i in lanes), dtype = numpy.uint8).reshape(-1, 16).copy()
+        active = len(lanes)
+        for step in range(laneBlocks[0] if lanes else 0):
+            while laneBlocks[active - 1] <= step: active -= 1
+            index = laneStarts[:active] + step
+            state = self.AESEncryptRounds(blocks[index] ^ chain[:active], roundKeys[:, :active], rounds)
+            blocks[index] = state
+            chain[:active] = state
+
+class AESBitslice:
+    # the same cipher as AES, applied to a batch of N blocks without any table lookups:
+    # the batch is bitsliced into 128 Python ints of N bits each - int 8 * i + b holds bit b
+    # of byte i (column-major, like AES.state) of every block of the batch, and every step of the cipher
+    # works on all N blocks at once with bitwise operations on those ints:
+    # SubBytes is a Boolean circuit (113 gates, Boyar and Peralta), ShiftRows only renumbers the ints,
+    # MixColumns and AddRoundKey are xors - AddRoundKey xors every one of the 128 ints, with all ones or 0
+    # for each key bit, so neither the operations nor the ints they use depend on the data or the key.
+    # pure Python, the fast engine for batches when numpy is not installed (see AES_Program.useBitslice)
+
+    batchBlocks = 1 << 12 # blocks bitsliced together (longer ints make every operation slower)
+    masks = {} # batch length -> masks of Transpose8
+
+    def AESCryptBlocksInPlace(self, view, schedule, operation, IV = None):
+        # run operation ('ECB-encrypt', 'ECB-decrypt' or 'CBC-decrypt') on the whole blocks of the writable buffer view
+        for start in range(0, len(view) - len(view) % 16, 16 * self.batchBlocks):
+            end = min(start + 16 * self.batchBlocks, len(view) - len(view) % 16)
+            data = bytes(view[start:end])
+            count = -(-(end - start) // 128) * 8 # blocks, rounded up to a multiple of 8 for the transposition
+            slices = self.Bitslice(data.ljust(16 * count, b'\0'), count)
+            ones = (1 << count) - 1
+            keys = self.KeySlices(schedule, ones)
+            if operation == 'ECB-encrypt':
+                slices = self.AESEncryptSlices(slices, keys, ones)
+            else:
+                slices = self.AESDecryptSlices(slices, keys, ones)
+            result = self.Unbitslice(slices, count)[:end - start]
+            if operation == 'CBC-decrypt':
+                # message block i = decrypted block i xor cryptogram block i - 1
+                result = xorBytes(result, bytes(IV) + data[:-16])
+                IV = data[-16:]
+            view[start:end] = result
+
+    def Bitslice(self, data, count):
+        # count blocks (a multiple of 8) -> 128 ints of count bits.
+        # byte i of all blocks is taken at once, then every 8x8 bit square of it (8 blocks) is transposed,
+        # so that byte b of the square holds bit b of the 8 blocks
+        slices = [0] * 128
+        masks = self.TransposeMasks(count)
+        for i in range(16):
+            column = self.Transpose8(int.from_bytes(data[i::16], 'little'), masks).to_bytes(count, 'little')
+            for b in range(8):
+                slices[8 * i + b] = int.from_bytes(column[b::8], 'little')
+        return slices
+
+    def Unbitslice(self, slices, count):
+        # reverse of Bitslice, returns a bytearray of count blocks
+        result = bytearray(16 * count)
+        column = bytearray(count)
+        masks = self.TransposeMasks(count)
+        for i in range(16):
+            for b in range(8):
+                column[b::8] = slices[8 * i + b].to_bytes(count // 8, 'little')
+            result[i::16] = self.Transpose8(int.from_bytes(column, 'little'), masks).to_bytes(count, 'little')
+        return result
+
+    def AESEncryptLanesCBC(self, buffer, starts, lengths, schedules, IVs):
+        # CBC encryption of many messages in the writable buffer, in place, like AESNumpy.AESEncryptLanesCBC:
+        # step j encrypts block j of every message that has one, the lanes bitsliced together
+        view = memoryview(buffer)
+        # lanes of different key lengths do not have the same number of rounds, so they run separately
+        for rounds in sorted(set(schedule.rounds for schedule in schedules)):
+            lanes = [i for i in range(len(schedules)) if schedules[i].rounds == rounds]
+            # longest messages first - the lanes still running at step j are always the first ones
+            lanes.sort(key = lambda i: -lengths[i])
+            for first in range(0, len(lanes), self.batchBlocks):
+                self.AESEncryptLanes(view, lanes[first:first + self.batchBlocks], starts, lengths, schedules, IVs, rounds)
+        view.release()
+
+    def AESEncryptLanes(self, view, lanes, starts, lengths, schedules, IVs, rounds):
+        # every lane has its own key: the round keys of the lanes are bitsliced like blocks,
+        # so bit k of the key slices is the key of lane k
+        count = -(-len(lanes) // 8) * 8
+        laneKeys = [self.Bitslice(b''.join(schedules[i].roundKeys[round] for i in lanes).ljust(16 * count, b'\0'), count)
+                    for round in range(rounds + 1)]
+        laneBlocks = [lengths[i] // 16 for i in lanes]
+        chain = b''.join(bytes(IVs[i]) for i in lanes) # latest cryptogram block of each lane
+        active = len(lanes)
+        keys = None
+        for step in range(laneBlocks[0] if lanes else 0):
+            while laneBlocks[active - 1] <= step: active -= 1
+            if keys is None or count != -(-active // 8) * 8:
+                # lanes that ended are dropped, 8 at a time (the high bits of the slices)
+                count = -(-active // 8) * 8
+                ones = (1 << count) - 1
+                keys = [[k & ones for k in key] for key in laneKeys]
+            positions = [starts[i] + 16 * step for i in lanes[:active]]
+            blocks = xorBytes(b''.join([view[p:p + 16] for p in positions]), chain[:16 * active])
+            slices = self.AESEncryptSlices(self.Bitslice(blocks.ljust(16 * count, b'\0'), count), keys, ones)
+            chain = bytes(self.Unbitslice(slices, count)[:16 * active])
+            for k, p in enumerate(positions):
+                view[p:p + 16] = chain[16 * k:16 * k + 16]
+
+    def TransposeMasks(self, count):
+        if count not in AESBitslice.masks:
+            words = (0x00AA00AA00AA00AA, 0x0000CCCC0000CCCC, 0x00000000F0F0F0F0)
+            AESBitslice.masks[count] = [int.from_bytes(word.to_bytes(8, 'little') * (count // 8), 'little') for word in words]
+        return AESBitslice.masks[count]
+
+    def Transpose8(self, x, masks):
+        # transpose every 8x8 bit square (64-bit word, bit 8 * row + column) of x, three swaps of bit groups
+        t = (x ^ (x >> 7)) & masks[0]; x ^= t ^ (t << 7)
+        t = (x ^ (x >> 14)) & masks[1]; x ^= t ^ (t << 14)
+        t = (x ^ (x >> 28)) & masks[2]; x ^= t ^ (t << 28)
+        return x
+
+    def RoundKeys(self, schedule):
+        # bitsliced round keys: for each round its 128 bits (0 or 1), in the order of the ints
+        if schedule.bitslicedKeys is None:
+            schedule.bitslicedKeys = [[(keyRound[i] >> b) & 1 for i in range(16) for b in range(8)]
+                                      for keyRound in schedule.roundKeys]
+        return schedule.bitslicedKeys
+
+    def KeySlices(self, schedule, ones):
+        # the round keys of a batch of N blocks: for each round 128 ints, ones (all N bits set) for a key bit 1, 0 for a 0
+        return [[ones * bit for bit in keyRound] for keyRound in self.RoundKeys(schedule)]
+
+    def AESAddRoundKey(self, s, key):
+        return [x ^ k for x, k in zip(s, key)]
+
+    def AESEncryptSlices(self, s, keys, ones):
+        # keys - round keys from KeySlices, ones is the int with all N bits set
+        rounds = len(keys) - 1
+        s = self.AESAddRoundKey(s, keys[0])
+        for round in range(1, rounds + 1):
+            s = self.AESSubBytesShiftRows(s, ones)
+            # the last round has no MixColumns
+            if round < rounds: s = self.AESMixColumns(s)
+            s = self.AESAddRoundKey(s, keys[round])
+        return s
+
+    def AESDecryptSlices(self, s, keys, ones):
+        rounds = len(keys) - 1
+        s = self.AESAddRoundKey(s, keys[rounds])
+        for round in range(rounds - 1, -1, -1):
+            s = self.AESInvShiftRowsInvSubBytes(s, ones)
+            s = self.AESAddRoundKey(s, keys[round])
+            if round > 0: s = self.AESInvMixColumns(s)
+        return s
+
+    def AESSubBytesShiftRows(self, s, ones):
+        # byte i of the result is SubBytes of byte shiftRows[i] of s
+        result = [0] * 128
+        sBox = self.AESSBoxCircuit
+        for i in range(16):
+            j = 8 * (4 * ((i // 4 + i % 4) % 4) + i % 4)
+            k = 8 * i
+            (result[k + 7], result[k + 6], result[k + 5], result[k + 4], result[k + 3], result[k + 2], result[k + 1], result[k]) = \
+                sBox(s[j + 7], s[j + 6], s[j + 5], s[j + 4], s[j + 3], s[j + 2], s[j + 1], s[j], ones)
+        return result
+
+    def AESInvShiftRowsInvSubBytes(self, s, ones):
+        # the inverse S-box is the S-box between two inverse affine transformations:
+        # InvSubBytes(y) = A'(SubBytes(A'(y))), A'(x) = A^-1 x xor 0x05 (the inverse of the affine step of the S-box)
+        result = [0] * 128
+        sBox = self.AESSBoxCircuit
+        for i in range(16):
+            j = 8 * (4 * ((i // 4 - i % 4) % 4) + i % 4)
+            k = 8 * i
+            x = [s[j + (b + 2) % 8] ^ s[j + (b + 5) % 8] ^ s[j + (b + 7) % 8] for b in range(8)]
+            x[0] ^= ones; x[2] ^= ones
+            y = sBox(x[7], x[6], x[5], x[4], x[3], x[2], x[1], x[0], ones)[::-1]
+            result[k:k + 8] = [y[(b + 2) % 8] ^ y[(b + 5) % 8] ^ y[(b + 7) % 8] for b in range(8)]
+            result[k] ^= ones; result[k + 2] ^= ones
+        return result
+
+    def AESMixColumns(self, s):
+        # a_i xor t xor 2 (a_i xor a_i+1) for each byte a_i of a column, t = a_0 xor a_1 xor a_2 xor a_3
+        result = [0] * 128
+        for c in range(0, 128, 32):
+            a = s[c:c + 32]
+            t = [a[b] ^ a[b + 8] ^ a[b + 16] ^ a[b + 24] for b in range(8)]
+            for r in range(0, 32, 8):
+                x = [a[r + b] ^ a[(r + 8) % 32 + b] for b in range(8)]
+                # multiplication by 2 (xtime): shift left, 0x1b added when the top bit was set
+                h = x[7]
+                doubled = (h, x[0] ^ h, x[1], x[2] ^ h, x[3] ^ h, x[4], x[5], x[6])
+                for b in range(8):
+                    result[c + r + b] = a[r + b] ^ t[b] ^ doubled[b]
+        return result
+
+    def AESInvMixColumns(self, s):
+        # InvMixColumns = MixColumns after adding 4 (a_0 xor a_2) to a_0, a_2 and 4 (a_1 xor a_3) to a_1, a_3
+        s = list(s)
+        for c in range(0, 128, 32):
+            for r in (0, 8):
+                x = [s[c + r + b] ^ s[c + r + 16 + b] for b in range(8)]
+                # multiplication by 4: xtime twice
+                for times in range(2):
+                    h = x[7]
+                    x = [h, x[0] ^ h, x[1], x[2] ^ h, x[3] ^ h, x[4], x[5], x[6]]
+                for b in range(8):
+                    s[c + r + b] ^= x[b]
+                    s[c + r + 16 + b] ^= x[b]
+        return self.AESMixColumns(s)
+
+    def AESSBoxCircuit(self, U0, U1, U2, U3, U4, U5, U6, U7, ones):
+        # the AES S-box as a circuit of 113 xor/and gates (Boyar and Peralta), U0 is the top bit of the input.
+        # returns the 8 output bits, top bit first. xnor gates are xors with ones
+        T1 = U0 ^ U3; T2 = U0 ^ U5; T3 = U0 ^ U6; T4 = U3 ^ U5; T5 = U4 ^ U6; T6 = T1 ^ T5; T7 = U1 ^ U2
+        T8 = U7 ^ T6; T9 = U7 ^ T7; T10 = T6 ^ T7; T11 = U1 ^ U5; T12 = U2 ^ U5; T13 = T3 ^ T4; T14 = T6 ^ T11
+        T15 = T5 ^ T11; T16 = T5 ^ T12; T17 = T9 ^ T16; T18 = U3 ^ U7; T19 = T7 ^ T18; T20 = T1 ^ T19
+        T21 = U6 ^ U7; T22 = T7 ^ T21; T23 = T2 ^ T22; T24 = T2 ^ T10; T25 = T20 ^ T17; T26 = T3 ^ T16; T27 = T1 ^ T12
+        M1 = T13 & T6; M2 = T23 & T8; M3 = T14 ^ M1; M4 = T19 & U7; M5 = M4 ^ M1; M6 = T3 & T16; M7 = T22 & T9
+        M8 = T26 ^ M6; M9 = T20 & T17; M10 = M9 ^ M6; M11 = T1 & T15; M12 = T4 & T27; M13 = M12 ^ M11
+        M14 = T2 & T10; M15 = M14 ^ M11; M16 = M3 ^ M2; M17 = M5 ^ T24; M18 = M8 ^ M7; M19 = M10 ^ M15
+        M20 = M16 ^ M13; M21 = M17 ^ M15; M22 = M18 ^ M13; M23 = M19 ^ T25; M24 = M22 ^ M23; M25 = M22 & M20
+        M26 = M21 ^ M25; M27 = M20 ^ M21; M28 = M23 ^ M25; M29 = M28 & M27; M30 = M26 & M24; M31 = M20 & M23
+        M32 = M27 & M31; M33 = M27 ^ M25; M34 = M21 & M22; M35 = M24 & M34; M36 = M24 ^ M25; M37 = M21 ^ M29
+        M38 = M32 ^ M33; M39 = M23 ^ M30; M40 = M35 ^ M36; M41 = M38 ^ M40; M42 = M37 ^ M39; M43 = M37 ^ M38
+        M44 = M39 ^ M40; M45 = M42 ^ M41
+        M46 = M44 & T6; M47 = M40 & T8; M48 = M39 & U7; M49 = M43 & T16; M50 = M38 & T9; M51 = M37 & T17
+        M52 = M42 & T15; M53 = M45 & T27; M54 = M41 & T10; M55 = M44 & T13; M56 = M40 & T23; M57 = M39 & T19
+        M58 = M43 & T3; M59 = M38 & T22; M60 = M37 & T20; M61 = M42 & T1; M62 = M45 & T4; M63 = M41 & T2
+        L0 = M61 ^ M62; L1 = M50 ^ M56; L2 = M46 ^ M48; L3 = M47 ^ M55; L4 = M54 ^ M58; L5 = M49 ^ M61
+        L6 = M62 ^ L5; L7 = M46 ^ L3; L8 = M51 ^ M59; L9 = M52 ^ M53; L10 = M53 ^ L4; L11 = M60 ^ L2
+        L12 = M48 ^ M51; L13 = M50 ^ L0; L14 = M52 ^ M61; L15 = M55 ^ L1; L16 = M56 ^ L0; L17 = M57 ^ L1
+        L18 = M58 ^ L8; L19 = M63 ^ L4; L20 = L0 ^ L1; L21 = L1 ^ L7; L22 = L3 ^ L12; L23 = L18 ^ L2
+        L24 = L15 ^ L9; L25 = L6 ^ L10; L26 = L7 ^ L9; L27 = L8 ^ L10; L28 = L11 ^ L14; L29 = L11 ^ L17
+        return (L6 ^ L24, L16 ^ L26 ^ ones, L19 ^ L28 ^ ones, L6 ^ L21, L20 ^ L22, L25 ^ L29, L13 ^ L27 ^ ones, L6 ^ L23 ^ ones)
+
+class AESEngine:
+    # a way of running the block cipher on many blocks of a buffer in place.
+    # every engine is registered in engines, which picks one of them for each call of CryptBlocksInPlace.
+    # a subclass sets name and defines CryptBlocksInPlace(view, schedule, operation, IV = None): it runs
+    # operation (one of its operations) on the whole blocks of the writable buffer view, overwriting them
+    # with the result (for CBC, IV is the cryptogram block that precedes view)
+
+    name = None
+    operations = ('ECB-encrypt', 'ECB-decrypt', 'CBC-encrypt', 'CBC-decrypt')
+    autotune = True # may be picked by calibration (otherwise only when asked for by name)
+    inProcess = True # runs in this process (False - hands the blocks over to worker processes)
+
+    def Available(self, program = None):
+        # whether the engine can run here with the settings of program
+        # (None - the defaults: the class attributes of AES_Program)
+        return True
+
+class AESReferenceEngine(AESEngine):
+    # AES itself, block by block: the slowest engine, the one the others are checked against
+    name = 'reference'
+    autotune = False
+
+    def CryptBlocksInPlace(self, view, schedule, operation, IV = None):
+        cipher = AES()
+        for i in range(0, len(view) - len(view) % 16, 16):
+            if operation == 'ECB-encrypt':
+                view[i:i + 16] = cipher.AESEncryptWithSchedule(view[i:i + 16], schedule)
+            elif operation == 'ECB-decrypt':
+                view[i:i + 16] = cipher.AESDecryptWithSchedule(view[i:i + 16], schedule)
+            elif operation == 'CBC-encrypt':
+                IV = cipher.AESEncryptWithSchedule(sxor(IV, view[i:i + 16]), schedule)
+                view[i:i + 16] = IV
+            else:
+                cryptogramBlock = bytes(view[i:i + 16])
+                view[i:i + 16] = sxor(IV, cipher.AESDecryptWithSchedule(cryptogramBlock, schedule))
+                IV = cryptogramBlock
+
+class AESTTableEngine(AESEngine):
+    name = 'ttable'
+
+    def CryptBlocksInPlace(self, view, schedule, operation, IV = None):
+        AESTTable().AESCryptBlocksInPlace(view, schedule, operation, IV)
+
+class AESNumpyEngine(AESEngine):
+    # every block of a CBC cryptogram depends on the previous one, so CBC encryption can not be vectorized
+    name = 'numpy'
+    operations = ('ECB-encrypt', 'ECB-decrypt', 'CBC-decrypt')
+
+    def Available(self, program = None):
+        return (program if program is not None else AES_Program).useNumpy and LoadNumpy() is not None
+
+    def CryptBlocksInPlace(self, view, schedule, operation, IV = None):
+        AESNumpy().AESCryptBlocksInPlace(view, schedule, operation, IV)
+
+class AESBitsliceEngine(AESEngine):
+    name = 'bitslice'
+    operations = ('ECB-encrypt', 'ECB-decrypt', 'CBC-decrypt')
+
+    def Available(self, program = None):
+        return (program if program is not None else AES_Program).useBitslice
+
+    def CryptBlocksInPlace(self, view, schedule, operation, IV = None):
+        AESBitslice().AESCryptBlocksInPlace(view, schedule, operation, IV)
+
+class AESPoolEngine(AESEngine):
+    # the blocks split between the worker processes of processPool (AES_Program.ParallelCrypt).
+    # starting and feeding workers costs more than a calibration run takes, so it is only used when asked for
+    name = 'pool'
+    operations = ('ECB-encrypt', 'ECB-decrypt', 'CBC-decrypt')
+    autotune = False
+    inProcess = False
+
+    def CryptBlocksInPlace(self, view, schedule, operation, IV = None):
+        view = view[:len(view) - len(view) % 16]
+        if len(view) == 0: return
+        program = AES_Program()
+        if program.parallelWorkers == 0: program.parallelWorkers = None # one worker per CPU
+        view[:] = program.ParallelCrypt(view, schedule, operation, IV)
+
+class AESEngineRegistry:
+    # the engines CryptBlocksInPlace can use, and which one it uses for an operation and a number of blocks.
+    # the first call on at least calibrationMinBlocks blocks checks every engine against fixed vectors and
+    # measures it on payloads of each band of sizes, smallest first, for about calibrationTime seconds
+    # (bands not reached by then get the fixed rules of DefaultChoice), and remembers the fastest.
+    # smaller payloads use DefaultChoice until then, so short messages never wait for calibration.
+    # the results are saved in a JSON file, so later runs on the same host
+    # (same Python, numpy, CPU and engines) read them instead of measuring again.
+    # environment variables:
+    #   AES_ENGINE - name of the engine to use whenever it can run the operation (like SetEngine)
+    #   AES_ENGINE_AUTOTUNE=0 - no calibration, the fixed rules of DefaultChoice (numpyMinBlocks, bitsliceMinBlocks)
+    #   AES_ENGINE_CACHE - file of the saved results (default: ~/.cache/AES_Program/engines.json, empty - not saved)
+
+    bands = [1, 4, 16, 64, 256, 1024, 4096] # lower bounds (blocks) of the bands of payload sizes calibrated separately
+    calibrationRuns = 3 # best of this many runs of each engine is taken
+    calibrationTime = 0.25 # seconds calibration may take (it finishes the band it is measuring)
+    calibrationMinBlocks = 16 # payloads of fewer blocks do not start calibration
+    cacheVersion = 1 # changed whenever saved results of older versions should not be trusted
+
+    def __init__(self):
+        self.engines = {} # name -> engine, in the order of registration
+        self.engine = None # name of the engine set by SetEngine
+        self.choices = None # operation -> name of the engine for each band, None - not calibrated yet
+        self.lock = threading.Lock()
+
+    def Register(self, engine):
+        self.engines[engine.name] = engine
+        with self.lock:
+            self.choices = None # calibrate again, the new engine may be faster
+        return engine
+
+    def Get(self, name):
+        if name not in self.engines:
+            raise ValueError("Unknown engine: {} (known: {})".format(name, ", ".join(self.engines)))
+        return self.engines[name]
+
+    def Available(self, program = None):
+        # names of the engines that can run here (with the settings of program)
+        return [name for name, engine in self.engines.items() if engine.Available(program)]
+
+    def SetEngine(self, name):
+        # use engine name for every operation it can run (None - back to the calibrated choice)
+        if name is not None: self.Get(name)
+        self.engine = name
+
+    def Select(self, operation, blockCount, inProcess = False, program = None):
+        # the engine for operation on blockCount blocks, allowed by the settings of program (useNumpy, useBitslice...;
+        # None - the class attributes of AES_Program). inProcess - one that runs in this process, e.g. in a worker of the pool engine
+        name = self.engine if self.engine is not None else os.environ.get('AES_ENGINE')
+        if name:
+            engine = self.Get(name)
+            if operation in engine.operations and engine.Available(program) and (engine.inProcess or not inProcess):
+                return engine
+        choices = self.Choices() if blockCount >= self.calibrationMinBlocks else self.choices
+        if choices is not None:
+            engine = self.engines.get(choices[operation][max(bisect.bisect_right(self.bands, blockCount) - 1, 0)])
+            # calibration used the default settings, program may not allow its choice (e.g. useNumpy = False)
+            if engine is not None and engine.Available(program): return engine
+        return self.engines[self.DefaultChoice(operation, blockCount, program)]
+
+    def DefaultChoice(self, operation, blockCount, program = None):
+        # the engine used without calibration
+        settings = program if program is not None else AES_Program
+        if operation != 'CBC-encrypt':
+            if blockCount >= settings.numpyMinBlocks and self.engines['numpy'].Available(program): return 'numpy'
+            if blockCount >= settings.bitsliceMinBlocks and self.engines['bitslice'].Available(program): return 'bitslice'
+        return 'ttable'
+
+    def Choices(self):
+        # operation -> engine name for each band (None when calibration is turned off)
+        if os.environ.get('AES_ENGINE_AUTOTUNE') == '0': return None
+        with self.lock:
+            if self.choices is None:
+                fingerprint = self.Fingerprint()
+                choices = self.LoadChoices(fingerprint)
+                if choices is None:
+                    choices = self.Calibrate()
+                    self.SaveChoices(fingerprint, choices)
+                self.choices = choices
+            return self.choices
+
+    def Fingerprint(self):
+        # what the speed of the engines depends on - saved results of another fingerprint are not used.
+        # numpy is told apart by where it is installed and when, so that reading saved results does not import it
+        import importlib.util
+        import platform
+        spec = importlib.util.find_spec('numpy') if AES_Program.useNumpy else None
+        numpyFile = "{}@{}".format(spec.origin, int(os.stat(spec.origin).st_mtime)) if spec is not None and spec.origin else None
+        return "python {} numpy {} bitslice {} {} cpus {} engines {} bands {} version {}".format(
+            platform.python_version(), numpyFile, AES_Program.useBitslice, platform.machine(), os.cpu_count(),
+            ",".join(self.engines), ",".join(str(band) for band in self.bands), self.cacheVersion)
+
+    def CachePath(self):
+        path = os.environ.get('AES_ENGINE_CACHE')
+        if path is not None: return path
+        cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(cache, 'AES_Program', 'engines.json')
+
+    def LoadChoices(self, fingerprint):
+        import json
+        path = self.CachePath()
+        if not path: return None
+        try:
+            with open(path) as file:
+                choices = json.load(file).get(fingerprint)
+        except (OSError, ValueError, AttributeError):
+            return None
+        # results naming engines that are not registered any more are measured again
+        if not isinstance(choices, dict) or set(choices) != set(AESEngine.operations): return None
+        for names in choices.values():
+            if len(names) != len(self.bands) or any(name not in self.engines for name in names): return None
+        return choices
+
+    def SaveChoices(self, fingerprint, choices):
+        # results of other fingerprints stay in the file (a home directory shared by different hosts).
+        # not being able to save only means calibrating again next time
+        import json
+        path = self.CachePath()
+        if not path: return
+        try:
+            try:
+                with open(path) as file:
+                    saved = json.load(file)
+                if not isinstance(saved, dict): saved = {}
+            except (OSError, ValueError):
+                saved = {}
+            saved[fingerprint] = choices
+            directory = os.path.dirname(path)
+            if directory: os.makedirs(directory, exist_ok = True)
+            # written next to the file, then renamed over it, so that readers never see half of it
+            temporary = "{}.{}.tmp".format(path, os.getpid())
+            with open(temporary, 'w') as file:
+                json.dump(saved, file, indent = 1, sort_keys = True)
+            os.replace(temporary, path)
+        except OSError:
+            pass
+
+    def Calibrate(self):
+        # operation -> name of the fastest engine for each band. engines that give wrong results are left out
+        deadline = time.perf_counter() + self.calibrationTime
+        schedule = AESKeySchedule(os.urandom(16))
+        candidates = [engine for engine in self.engines.values()
+                      if engine.autotune and engine.Available() and not self.CheckEngine(engine)]
+        choices = {operation: [] for operation in AESEngine.operations}
+        # small bands first: when time runs out, the large ones are left to DefaultChoice
+        for band in self.bands:
+            data = os.urandom(16 * band)
+            for operation in AESEngine.operations:
+                operationCandidates = [engine for engine in candidates if operation in engine.operations]
+                if len(operationCandidates) == 1:
+                    choices[operation].append(operationCandidates[0].name)
+                    continue
+                if not operationCandidates or time.perf_counter() > deadline:
+                    choices[operation].append(self.DefaultChoice(operation, band))
+                    continue
+                best = None
+                for engine in operationCandidates:
+                    elapsed = self.Time(engine, data, schedule, operation, best[0] if best else None, deadline)
+                    if best is None or elapsed < best[0]: best = (elapsed, engine.name)
+                choices[operation].append(best[1])
+        return choices
+
+    def Time(self, engine, data, schedule, operation, bestTime = None, deadline = None):
+        # shortest time of calibrationRuns runs of engine on data. an engine much slower
+        # than bestTime (the fastest one so far) can not win, so it is not run again;
+        # after deadline every engine is run only once
+        buffer = bytearray(len(data))
+        IV = bytes(16)
+        shortest = None
+        for run in range(self.calibrationRuns):
+            buffer[:] = data
+            start = time.perf_counter()
+            engine.CryptBlocksInPlace(memoryview(buffer), schedule, operation, IV)
+            elapsed = time.perf_counter() - start
+            if shortest is None or elapsed < shortest: shortest = elapsed
+            if bestTime is not None and shortest > 2 * bestTime: break
+            if deadline is not None and time.perf_counter() > deadline: break
+        return shortest
+
+    def CheckEngine(self, engine):
+        # names of the checks engine fails: the ECB and CBC vectors of AES_Program.tests given in hex
+        # (FIPS-197 and SP 800-38A: whole blocks of every key length), and a fixed payload of every key length
+        # compared with the ttable engine (checked by the vectors itself). a few dozen blocks in all,
+        # so even checking the reference engine takes only milliseconds
+        failures = []
+        for test, vector in AES_Program.tests.items():
+            if vector.get('format') != 'hex' or vector['mode'] not in ('ECB', 'CBC'): continue
+            key, message, cryptogram = [bytes.fromhex(vector[field]) for field in ('key', 'message', 'expectedCryptogram')]
+            IV = bytes.fromhex(vector['initialValue']) if vector['mode'] == 'CBC' else None
+            schedule = AESKeySchedule(key)
+            for operation, data, expected in ((vector['mode'] + '-encrypt', message, cryptogram), (vector['mode'] + '-decrypt', cryptogram, message)):
+                if operation not in engine.operations: continue
+                result = bytearray(data)
+                engine.CryptBlocksInPlace(memoryview(result), schedule, operation, IV)
+                if result != expected: failures.append("{} {}".format(test, operation))
+        if engine.name == 'ttable': return failures
+        reference = self.engines['ttable']
+        # a number of blocks that is not a multiple of the batches of any engine
+        data = bytes(index % 251 for index in range(16 * 37))
+        IV = bytes(range(16))
+        for keyLength in (16, 24, 32):
+            schedule = AESKeySchedule(bytes(range(keyLength, 2 * keyLength)))
+            for operation in engine.operations:
+                result = bytearray(data)
+                expected = bytearray(data)
+                engine.CryptBlocksInPlace(memoryview(result), schedule, operation, IV)
+                reference.CryptBlocksInPlace(memoryview(expected), schedule, operation, IV)
+                if result != expected: failures.append("37 blocks {}-bit {}".format(8 * keyLength, operation))
+        return failures
+
+# every engine CryptBlocksInPlace can use
+engines = AESEngineRegistry()
+engines.Register(AESReferenceEngine())
+engines.Register(AESTTableEngine())
+engines.Register(AESNumpyEngine())
+engines.Register(AESBitsliceEngine())
+engines.Register(AESPoolEngine())
+
+def CryptBlocksInPlace(view, schedule, operation, IV = None, inProcess = False, program = None):
+    # run operation ('ECB-encrypt', 'ECB-decrypt', 'CBC-encrypt' or 'CBC-decrypt') on the
+    # whole blocks of the writable buffer view, overwriting them with the result.
+    # for CBC, IV is the cryptogram block that precedes view.
+    # the engine is the one engines picks for the operation and the number of blocks, among those
+    # the settings of program allow (inProcess - not the pool engine, used by its worker processes)
+    engines.Select(operation, len(view) // 16, inProcess, program).CryptBlocksInPlace(view, schedule, operation, IV)
+
+class AESCipher:
+    # cipher context of a single key: the key schedule is computed once when the context is made,
+    # every call keeps its state (blocks, chaining value, counters) in local variables.
+    # a context can not be changed after it is made, so one context can be used
+    # by many threads at the same time and reused for any number of messages
+    __slots__ = ('schedule', 'program')
+
+    def __init__(self, key, program = None):
+        object.__setattr__(self, 'schedule', keyScheduleCache.GetSchedule(key))
+        object.__setattr__(self, 'program', program if program is not None else AES_Program())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AESCipher is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("AESCipher is immutable")
+
+    def EncryptBlock(self, block):
+        return blockWords.pack(*AESTTable.AESEncryptWords(None, *blockWords.unpack(block), self.schedule))
+
+    def DecryptBlock(self, block):
+        return blockWords.pack(*AESTTable.AESDecryptWords(None, *blockWords.unpack(block), self.schedule))
+
+    # the binary API of AES_Program with this context's key schedule (no cache lookup)
+    def EncryptECB(self, data, out = None, padding = True):
+        return self.program.EncryptBytesAES_ECB(data, self.schedule, out, padding)
+
+    def DecryptECB(self, cryptogram, out = None, padding = True):
+        return self.program.DecryptBytesAES_ECB(cryptogram, self.schedule, out, padding)
+
+    def EncryptCBC(self, data, IV, out = None, padding = True):
+        return self.program.EncryptBytesAES_CBC(data, self.schedule, IV, out, padding)
+
+    def DecryptCBC(self, cryptogram, IV, out = None, padding = True):
+        return self.program.DecryptBytesAES_CBC(cryptogram, self.schedule, IV, out, padding)
+
+    def CryptCTR(self, data, nonce, offset = 0, out = None):
+        return self.program.CryptBytesAES_CTR(data, self.schedule, nonce, offset, out)
+
+    def EncryptGCM(self, data, IV, associatedData = b'', out = None):
+        return self.program.EncryptBytesAES_GCM(data, self.schedule, IV, associatedData, out)
+
+    def DecryptGCM(self, cryptogram, IV, tag, associatedData = b'', out = None):
+        return self.program.DecryptBytesAES_GCM(cryptogram, self.schedule, IV, tag, associatedData, out)
+
+class AESEncryptor:
+    # incremental (hashlib-style) encryption in ECB or CBC mode:
+    # feed the message in pieces of any size with update(), every call returns
+    # the cryptogram of all blocks completed so far, finalize() pads the rest
+    # of the message (PKCS#7) and returns the last cryptogram block(s).
+    # the key schedule, the CBC chaining block and the incomplete block
+    # are kept between calls, so the whole message is never held in memory
+
+    def __init__(self, mode, key, IV = None, program = None):
+        if mode not in ('ECB', 'CBC'):
+            raise ValueError("Unsupported mode: {}".format(mode))
+        if mode == 'CBC' and (IV is None or len(IV) != AES_Program.bytesPerBlock):
+            raise ValueError("CBC mode needs an IV of {} bytes".format(AES_Program.bytesPerBlock))
+        self.program = program if program is not None else AES_Program()
+        self.mode = mode
+        self.schedule = keyScheduleCache.GetSchedule(key)
+        self.previousBlock = bytes(IV) if IV is not None else None # latest cryptogram block (CBC)
+        self.remainder = bytearray() # bytes of the incomplete last block
+        self.finalized = False
+
+    def update(self, data):
+        if self.finalized:
+            raise ValueError("update() called after finalize()")
+        if isinstance(data, str): data = data.encode(AES_Program.encoding)
+        self.remainder += data
+        # encrypt all complete blocks, keep the incomplete one for later
+        completeLength = len(self.remainder) - len(self.remainder) % AES_Program.bytesPerBlock
+        return self.EncryptBlocks(completeLength)
+
+    def finalize(self):
+        if self.finalized:
+            raise ValueError("finalize() called twice")
+        self.finalized = True
+        # PKCS#7 padding: a full block of padding if the message length is a multiple of block size
+        paddingLength = AES_Program.bytesPerBlock - len(self.remainder)
+        self.remainder += bytes([paddingLength]) * paddingLength
+        return self.EncryptBlocks(len(self.remainder))
+
+    def EncryptBlocks(self, length):
+        # encrypt the first length bytes of remainder and remove them from it
+        blocks = self.remainder[:length]
+        del self.remainder[:length]
+        if length == 0: return b''
+        CryptBlocksInPlace(memoryview(blocks), self.schedule, self.mode + '-encrypt', self.previousBlock, program = self.program)
+        if self.mode == 'CBC': self.previousBlock = bytes(blocks[-AES_Program.bytesPerBlock:])
+        return bytes(blocks)
+
+class AESKeystreamPrefetcher:
+    # generates CTR keystream for one (key, nonce) pair ahead of time on a background thread,
+    # so that encrypting a short message takes only a xor with keystream that is already there.
+    # messages use consecutive parts of the stream, Encrypt() returns the stream offset
+    # of each one, which is needed to decrypt it (AES_Program.CryptBytesAES_CTR(..., offset))
+
+    def __init__(self, key, nonce, offset = 0, bufferBlocks = 4096, chunkBlocks = 256, program = None):
+        self.program = program if program is not None else AES_Program()
+        self.schedule = keyScheduleCache.GetSchedule(key)
+        self.nonce = bytes(nonce)
+        if len(self.nonce) > AES_Program.bytesPerBlock:
+            raise ValueError("Nonce longer than a block")
+        self.bufferLength = bufferBlocks * AES_Program.bytesPerBlock # how much keystream to keep ready
+        self.chunkBlocks = chunkBlocks # blocks generated by the thread at once
+        self.nextBlock = offset // AES_Program.bytesPerBlock # first block not generated yet
+        self.position = self.nextBlock * AES_Program.bytesPerBlock # stream offset of keystream[0]
+        self.keystream = bytearray() # generated, not used yet
+        self.wanted = 0 # length a waiting Take() needs
+        self.closed = False
+        self.error = None # exception that stopped the thread, raised again by Take()
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target = self.Run, daemon = True)
+        self.thread.start()
+        # skip the part of the first block before offset
+        if offset > self.position: self.Take(offset - self.position)
+
+    def Run(self):
+        while True:
+            with self.condition:
+                while not self.closed and len(self.keystream) >= max(self.bufferLength, self.wanted):
+                    self.condition.wait()
+                if self.closed: return
+                firstBlock = self.nextBlock
+                self.nextBlock += self.chunkBlocks
+            # generate outside of the lock, so Take() is never blocked by it
+            try:
+                chunk = self.program.KeystreamAES_CTR(self.schedule, self.nonce, firstBlock, self.chunkBlocks)
+            except Exception as exception:
+                with self.condition:
+                    self.error = exception
+                    self.closed = True
+                    self.condition.notify_all()
+                return
+            with self.condition:
+                self.keystream += chunk
+                self.condition.notify_all()
+
+    def Take(self, length):
+        # the next length bytes of keystream and their offset in the stream
+        with self.condition:
+            self.wanted = length
+            self.condition.notify_all()
+            while len(self.keystream) < length:
+                if self.error is not None:
+                    raise self.error
+                if self.closed:
+                    raise ValueError("Keystream prefetcher is closed")
+                self.condition.wait()
+            keystream = bytes(self.keystream[:length])
+            del self.keystream[:length]
+            offset = self.position
+            self.position += length
+            self.wanted = 0
+            self.condition.notify_all()
+        return offset, keystream
+
+    def Encrypt(self, data):
+        # returns (stream offset, cryptogram); decryption is the same operation
+        offset, keystream = self.Take(len(data))
+        return offset, xorBytes(data, keystream)
+
+    def Close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+class AESGHASH:
+    # GHASH - the hash that authenticates GCM: a polynomial in H = E(key, 0^128)
+    # over GF(2^128), computed block by block as y = (y xor block) * H.
+    # the multiplication uses Shoup's 8-bit tables: 256 multiples of H, made once
+    # per key and kept in the AESKeySchedule (so they are cached together with it),
+    # and the shared ghashReduction table; then a multiplication is 16 lookups
+
+    def __init__(self, schedule):
+        if schedule.ghashTable is None:
+            schedule.ghashTable = self.MakeTable(schedule)
+        self.table = schedule.ghashTable
+        self.state = 0 # y, a 128-bit number (bit 0 of the field is the highest bit)
+        self.remainder = bytearray() # bytes of the incomplete last block
+
+    def MakeTable(self, schedule):
+        H = bytearray(16) # the encrypted zero block
+        CryptBlocksInPlace(memoryview(H), schedule, 'ECB-encrypt')
+        H = int.from_bytes(H, 'big')
+        table = [0] * 256
+        # a byte b stands for the element with bits of b as its first 8 coefficients;
+        # 0x80 is 1, 0x40 is x, ... so the single-bit bytes are H, x*H, x^2*H, ...
+        multiple = H
+        for bit in (0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01):
+            table[bit] = multiple
+            multiple = (multiple >> 1) ^ (AES_Tables.ghashPolynomial if multiple & 1 else 0)
+        # multiplication is linear, so other bytes are xors of the single-bit ones
+        for b in range(1, 256):
+            if b & (b - 1): table[b] = table[b & (b - 1)] ^ table[b & -b]
+        return table
+
+    def Update(self, data):
+        # hash more data; it is split into blocks independently of how it is split between calls
+        self.remainder += data
+        completeLength = len(self.remainder) - len(self.remainder) % 16
+        self.AddBlocks(memoryview(self.remainder)[:completeLength])
+        del self.remainder[:completeLength]
+
+    def Pad(self):
+        # pad the incomplete last block with zeros (GCM pads the associated data and the cryptogram separately)
+        if self.remainder:
+            self.AddBlocks(bytes(self.remainder.ljust(16, b'\0')))
+            self.remainder.clear()
+
+    def Digest(self, firstLength, secondLength):
+        # hash the final block - lengths in bits of the two padded parts - and return y as 16 bytes
+        self.Pad()
+        self.AddBlocks(((firstLength << 64) | secondLength).to_bytes(16, 'big'))
+        return self.state.to_bytes(16, 'big')
+
+    def AddBlocks(self, data):
+        table = self.table
+        reduction = AES_Tables.ghashReduction
+        y = self.state
+        for offset in range(0, len(data), 16):
+            x = y ^ int.from_bytes(data[offset:offset + 16], 'big')
+            # Horner's scheme over the bytes of x, last byte first:
+            # y = y * x^8 + (byte * H), multiplying by x^8 is a shift by 8 bits and a reduction
+            y = 0
+            for b in x.to_bytes(16, 'little'):
+                y = (y >> 8) ^ reduction[y & 255] ^ table[b]
+        self.state = y
+
+class AESCTRCryptor:
+    # incremental CTR mode encryption and decryption (the same operation):
+    # each piece continues the keystream where the previous one ended
+
+    def __init__(self, key, nonce, offset = 0, program = None):
+        if nonce is None:
+            raise ValueError("CTR mode needs a nonce")
+        self.program = program if program is not None else AES_Program()
+        self.schedule = keyScheduleCache.GetSchedule(key)
+        self.nonce = bytes(nonce)
+        self.offset = offset # stream offset of the next piece
+        self.finalized = False
+
+    def update(self, data):
+        if self.finalized:
+            raise ValueError("update() called after finalize()")
+        if isinstance(data, str): data = data.encode(AES_Program.encoding)
+        result = self.program.CryptBytesAES_CTR(data, self.schedule, self.nonce, self.offset)
+        self.offset += len(result)
+        return bytes(result)
+
+    def finalize(self):
+        if self.finalized:
+            raise ValueError("finalize() called twice")
+        self.finalized = True
+        return b''
+
+class AESGCMEncryptor:
+    # incremental GCM encryption: CTR mode encryption (with a 32-bit counter)
+    # and GHASH of the associated data and the cryptogram in one pass.
+    # update() returns the cryptogram of the data given so far, after finalize() tag holds the tag
+
+    tagLength = 16
+
+    def __init__(self, key, IV, associatedData = b'', program = None):
+        self.program = program if program is not None else AES_Program()
+        self.schedule = keyScheduleCache.GetSchedule(key)
+        IV = bytes(IV)
+        if len(IV) == 0:
+            raise ValueError("GCM needs a non-empty IV")
+        if len(IV) == 12:
+            # the recommended IV length: the first counter block is IV || 1
+            self.firstCounter = IV + b'\0\0\0\1'
+        else:
+            # other lengths are hashed into the first counter block
+            ivHash = AESGHASH(self.schedule)
+            ivHash.Update(IV)
+            self.firstCounter = ivHash.Digest(0, len(IV) * 8)
+        self.ghash = AESGHASH(self.schedule)
+        self.ghash.Update(associatedData)
+        self.ghash.Pad()
+        self.associatedLength = len(associatedData)
+        self.length = 0 # bytes encrypted so far
+        self.tag = None
+        self.finalized = False
+
+    def update(self, data):
+        return bytes(self.UpdateInto(data))
+
+    def UpdateInto(self, data, out = None):
+        # like update(), but returns a bytearray or writes into out (see AES_Program.EncryptBytes)
+        if self.finalized:
+            raise ValueError("update() called after finalize()")
+        cryptogram = self.Crypt(data, out)
+        # the cryptogram is as long as data in bytes (data may be an array of longer items)
+        self.ghash.Update(cryptogram if out is None else memoryview(out).cast('B')[:memoryview(data).nbytes])
+        return cryptogram
+
+    def Crypt(self, data, out):
+        # the message is encrypted with keystream from the counter block after the first one
+        # (the first one encrypts the tag), data continues where the previous piece ended
+        length = memoryview(data).nbytes
+        result = self.program.CryptBytesAES_CTR(data, self.schedule, self.firstCounter, self.length + 16, out, 32)
+        self.length += length
+        return result
+
+    def finalize(self):
+        if self.finalized:
+            raise ValueError("finalize() called twice")
+        self.finalized = True
+        self.tag = self.ComputeTag()
+        return b''
+
+    def ComputeTag(self):
+        hashed = self.ghash.Digest(self.associatedLength * 8, self.length * 8)
+        return xorBytes(hashed, self.program.KeystreamAES_CTR(self.schedule, self.firstCounter, 0, 1))[:self.tagLength]
+
+class AESGCMDecryptor(AESGCMEncryptor):
+    # incremental GCM decryption. update() returns the message of the data given so far,
+    # but it must not be trusted until finalize() checks the tag (it raises ValueError if it does not match).
+    # the tag is given here or to finalize()
+
+    def __init__(self, key, IV, associatedData = b'', tag = None, program = None):
+        AESGCMEncryptor.__init__(self, key, IV, associatedData, program)
+        self.tag = tag
+
+    def UpdateInto(self, data, out = None):
+        if self.finalized:
+            raise ValueError("update() called after finalize()")
+        # hash the cryptogram before it is decrypted, it may be overwritten (decryption in place)
+        self.ghash.Update(data)
+        return self.Crypt(data, out)
+
+    def finalize(self, tag = None):
+        if self.finalized:
+            raise ValueError("finalize() called twice")
+        self.finalized = True
+        if tag is None: tag = self.tag
+        if tag is None or len(tag) != self.tagLength:
+            raise ValueError("GCM decryption needs the {} byte tag".format(self.tagLength))
+        import hmac
+        if not hmac.compare_digest(self.ComputeTag(), bytes(tag)):
+            raise ValueError("Authentication failed: the tag does not match")
+        return b''
+
+class AESDecryptor:
+    # incremental (hashlib-style) decryption in ECB or CBC mode, the counterpart of AESEncryptor.
+    # update() returns the message bytes of all blocks completed so far, except the
+    # latest block - it may hold the padding, which only finalize() can remove
+    # (message bytes rather than a string are returned, because a piece may end inside a character)
+
+    def __init__(self, mode, key, IV = None, program = None):
+        if mode not in ('ECB', 'CBC'):
+            raise ValueError("Unsupported mode: {}".format(mode))
+        if mode == 'CBC' and (IV is None or len(IV) != AES_Program.bytesPerBlock):
+            raise ValueError("CBC mode needs an IV of {} bytes".format(AES_Program.bytesPerBlock))
+        self.program = program if program is not None else AES_Program()
+        self.mode = mode
+        self.schedule = keyScheduleCache.GetSchedule(key)
+        self.previousBlock = bytes(IV) if IV is not None else None # latest cryptogram block (CBC)
+        self.remainder = bytearray() # cryptogram bytes not decrypted yet
+        self.finalized = False
+
+    def update(self, data):
+        if self.finalized:
+            raise ValueError("update() called after finalize()")
+        self.remainder += data
+        # decrypt all complete blocks but the latest one
+        completeLength = max(0, (len(self.remainder) - 1) // AES_Program.bytesPerBlock * AES_Program.bytesPerBlock)
+        return self.DecryptBlocks(completeLength)
+
+    def finalize(self):
+        if self.finalized:
+            raise ValueError("finalize() called twice")
+        self.finalized = True
+        if len(self.remainder) != AES_Program.bytesPerBlock:
+            raise ValueError("Cryptogram length is not a multiple of block size")
+        lastBlock = self.DecryptBlocks(AES_Program.bytesPerBlock)
+        # remove padding (revert PKCS#7 padding)
+        paddingLength = lastBlock[-1]
+        if paddingLength < 1 or paddingLength > AES_Program.bytesPerBlock:
+            raise ValueError("Invalid padding")
+        return lastBlock[:-paddingLength]
+
+    def DecryptBlocks(self, length):
+        # decrypt the first length bytes of remainder and remove them from it
+        blocks = self.remainder[:length]
+        del self.remainder[:length]
+        if length == 0: return b''
+        nextPreviousBlock = bytes(blocks[-AES_Program.bytesPerBlock:])
+        CryptBlocksInPlace(memoryview(blocks), self.schedule, self.mode + '-decrypt', self.previousBlock, program = self.program)
+        if self.mode == 'CBC': self.previousBlock = nextPreviousBlock
+        return bytes(blocks)
+
+class AESInstrumentation:
+    # opt-in counters of calls, bytes, blocks and cumulative time for each stage of
+    # the cipher (key expansion, round functions, engines) and each mode method of AES_Program.
+    # Enable() replaces the measured methods with counting wrappers and Disable() puts the
+    # original methods back, so when instrumentation is off it costs nothing at all.
+    # time of a stage includes the stages it calls (a mode method includes its rounds).
+    # calls made in worker processes (AES_Program.parallelWorkers) are not counted
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {} # stage name -> [calls, bytes, blocks, seconds]
+        self.originals = {} # (class, method name) -> original method
+        self.enabled = 0 # Enable() calls not matched by Disable() yet
+
+    def Targets(self):
+        # (class, method name, stage name, bytes processed by a call - computed from its arguments:
+        # argument(i) is argument i of the call (0 is self), whether it was passed by position or by name)
+        block = lambda argument: 16
+        first = lambda argument: byteLength(argument(1))
+        messages = lambda argument: sum(byteLength(message) for message in argument(1))
+        fileSize = lambda argument: os.path.getsize(argument(1)) # of the input, after the call (the output when in place)
+        # the range asked for, cut at the end of the cryptogram (arguments start and length)
+        messageRange = lambda start: lambda argument: max(0, min(argument(start + 1), byteLength(argument(1)) - argument(start)))
+        targets = [
+            (AES, 'AESKeyExpansion', 'AESKeyExpansion', lambda argument: 0),
+            (AES, 'AESSubBytes', 'AESSubBytes', block),
+            (AES, 'AESShiftRows', 'AESShiftRows', block),
+            (AES, 'AESMixColumns', 'AESMixColumns', block),
+            (AES, 'AESAddRoundKey', 'AESAddRoundKey', block),
+            (AES, 'AESEncryptWithSchedule', 'AES.AESEncrypt', block),
+            (AES, 'AESDecryptWithSchedule', 'AES.AESDecrypt', block),
+            (AESTTable, 'AESEncryptWords', 'AESTTable.AESEncrypt', block),
+            (AESTTable, 'AESDecryptWords', 'AESTTable.AESDecrypt', block),
+            (AESTTable, 'AESCryptBlocksInPlace', 'AESTTable.AESCryptBlocksInPlace', first),
+            (AESNumpy, 'AESEncryptBlocks', 'AESNumpy.AESEncrypt', first),
+            (AESNumpy, 'AESCryptBlocksInPlace', 'AESNumpy.AESCryptBlocksInPlace', first),
+            (AESNumpy, 'AESDecryptBlocks', 'AESNumpy.AESDecrypt', first),
+            (AESBitslice, 'AESCryptBlocksInPlace', 'AESBitslice.AESCryptBlocksInPlace', first),
+            (AESGHASH, 'AddBlocks', 'AESGHASH', first),
+            (AES_Program, 'KeystreamAES_CTR', 'KeystreamAES_CTR', lambda argument: 16 * argument(4)),
+            (AES_Program, 'ParallelCrypt', 'ParallelCrypt', first),
+            (AES_Program, 'EncryptBatch', 'EncryptBatch', messages),
+            (AES_Program, 'DecryptBatch', 'DecryptBatch', messages),
+            (AES_Program, 'EncryptLanesAES_CBC', 'EncryptLanesAES_CBC', messages),
+            (AES_Program, 'EncryptFileAES', 'EncryptFileAES', fileSize),
+            (AES_Program, 'DecryptFileAES', 'DecryptFileAES', fileSize),
+            (AES_Program, 'DecryptRange', 'DecryptRange', messageRange(5)),
+            (AES_Program, 'DecryptRangeAES_ECB', 'DecryptRangeAES_ECB', messageRange(3)),
+            (AES_Program, 'DecryptRangeAES_CBC', 'DecryptRangeAES_CBC', messageRange(4)),
+            (AES_Program, 'EncryptContainer', 'EncryptContainer', fileSize),
+            (AES_Program, 'DecryptContainer', 'DecryptContainer', fileSize),
+        ]
+        for method in ('EncryptAES_ECB', 'DecryptAES_ECB', 'EncryptAES_CBC', 'DecryptAES_CBC', 'EncryptAES_CTR', 'DecryptAES_CTR',
+                       'EncryptAES_GCM', 'DecryptAES_GCM', 'EncryptBytesAES_ECB', 'DecryptBytesAES_ECB', 'EncryptBytesAES_CBC',
+                       'DecryptBytesAES_CBC', 'CryptBytesAES_CTR', 'EncryptBytesAES_GCM', 'DecryptBytesAES_GCM',
+                       'EncryptBytesAES_XTS', 'DecryptBytesAES_XTS'):
+            targets.append((AES_Program, method, method, first))
+        return targets
+
+    def Enable(self):
+        with self.lock:
+            self.enabled += 1
+            if self.enabled > 1: return
+            for owner, name, stage, size in self.Targets():
+                original = owner.__dict__[name]
+                self.originals[(owner, name)] = original
+                setattr(owner, name, self.Wrap(original, stage, size))
+
+    def Disable(self):
+        with self.lock:
+            if self.enabled == 0: return
+            self.enabled -= 1
+            if self.enabled > 0: return
+            for (owner, name), original in self.originals.items():
+                setattr(owner, name, original)
+            self.originals.clear()
+
+    def Wrap(self, function, stage, size):
+        # the wrapper counts the call and returns (or raises) whatever function does,
+        # a call whose size can't be computed from its arguments is counted with 0 bytes
+        import inspect
+        counters = self.stats.setdefault(stage, [0, 0, 0, 0.0])
+        lock = self.lock
+        clock = time.perf_counter
+        parameters = list(inspect.signature(function).parameters)
+        def Counted(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                argument = lambda i: args[i] if i < len(args) else kwargs[parameters[i]]
+                try:
+                    byteCount = size(argument)
+                except Exception:
+                    byteCount = 0
+                with lock:
+                    counters[0] += 1
+                    counters[1] += byteCount
+                    counters[2] += -(-byteCount // 16)
+                    counters[3] += elapsed
+        Counted.__wrapped__ = function
+        return Counted
+
+    def Snapshot(self):
+        # {stage: {"calls", "bytes", "blocks", "seconds"}} for stages called at least once
+        with self.lock:
+            return {stage: {"calls": c[0], "bytes": c[1], "blocks": c[2], "seconds": c[3]}
+                    for stage, c in self.stats.items() if c[0] > 0}
+
+    def Reset(self):
+        with self.lock:
+            for counters in self.stats.values():
+                counters[:] = [0, 0, 0, 0.0]
+
+    @contextmanager
+    def Measure(self):
+        # with instrumentation.Measure() as scope: ...
+        # enables instrumentation inside the block; afterwards scope holds what the block did
+        # (counted like Snapshot(); calls from other threads in the meantime are included too)
+        self.Enable()
+        before = self.Snapshot()
+        scope = {}
+        try:
+            yield scope
+        finally:
+            after = self.Snapshot()
+            self.Disable()
+            empty = {"calls": 0, "bytes": 0, "blocks": 0, "seconds": 0.0}
+            for stage, counters in after.items():
+                difference = {field: counters[field] - before.get(stage, empty)[field] for field in counters}
+                if difference["calls"] > 0: scope[stage] = difference
+
+# instrumentation of the whole program, off until instrumentation.Enable() or instrumentation.Measure()
+instrumentation = AESInstrumentation()
+
+# number of bytes in a string (in AES_Program.encoding) or in any bytes-like object
+def byteLength(data):
+    if isinstance(data, str): return len(data.encode(AES_Program.encoding))
+    return memoryview(data).nbytes
+
+# a block as its 4 column words (big-endian, column 0 first)
+blockWords = struct.Struct('>4I')
+
+# function that xors long byte strings of equal length - on big integers
+# instead of byte by byte (returns bytes)
+def xorBytes(ba1, ba2):
+    return (int.from_bytes(ba1, 'big') ^ int.from_bytes(ba2, 'big')).to_bytes(len(ba1), 'big')
+
+# function that xors byte strings
+def sxor(ba1, ba2):
+    return bytes([_a ^ _b for _a, _b in zip(ba1, ba2)])
+
+# shifts bytes in a word to the left (rotates the word) n times
+def rotateWord(word, n):
+    return word[n:] + word[:n]
@@ -0,0 +1,83 @@
+
+# worker processes and threads shared by every AES_Program, started when they are first needed
+# (AES_Program.parallelWorkers, EncryptBatch, streams). in its own module, so that importing
+# the package does not import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import os
+import threading
+
+from .AES_Core import CryptBlocksInPlace, keyScheduleCache
+
+def AESProcessChunk(sharedName, start, end, key, operation, IV, legacy = False):
+    # runs in a worker process: process bytes start:end of the shared memory block in place.
+    # the key is expanded only the first time this worker sees it (keyScheduleCache of the worker)
+    sharedData = shared_memory.SharedMemory(name = sharedName)
+    view = sharedData.buf[start:end]
+    try:
+        CryptBlocksInPlace(view, keyScheduleCache.GetSchedule(key, legacy), operation, IV, inProcess = True)
+    finally:
+        # the view has to be released before the shared memory can be closed
+        view.release()
+        sharedData.close()
+
+class AESProcessPool:
+    # pools of worker processes that live as long as the program,
+    # so that workers (and the key schedules they cached) are reused between calls.
+    # there is one pool for each number of workers asked for - a pool is never shut down
+    # while the program runs, other threads may still be submitting work to it
+
+    executorClass = ProcessPoolExecutor
+
+    def __init__(self):
+        self.executors = {} # number of workers -> executor
+        self.workers = 0 # number of workers of the pool asked for last
+        self.lock = threading.Lock()
+        # held while work is submitted (a worker process may be forked then) and while shared memory
+        # is made or removed (which takes the lock of the resource tracker): a worker forked while
+        # another thread holds that lock would wait for it forever when attaching to shared memory
+        self.forkLock = threading.Lock()
+
+    def Workers(self, workers = None):
+        # the number of workers of GetExecutor(workers)
+        return workers if workers is not None else os.cpu_count() or 1
+
+    def GetExecutor(self, workers = None):
+        workers = self.Workers(workers)
+        with self.lock:
+            if workers not in self.executors:
+                self.executors[workers] = self.executorClass(max_workers = workers)
+            self.workers = workers
+            return self.executors[workers]
+
+    def Submit(self, workers, function, *args):
+        # a future of function(*args) run on the pool of workers workers
+        with self.forkLock:
+            return self.GetExecutor(workers).submit(function, *args)
+
+    def NewSharedMemory(self, size):
+        with self.forkLock:
+            return shared_memory.SharedMemory(create = True, size = size)
+
+    def RemoveSharedMemory(self, sharedData):
+        with self.forkLock:
+            sharedData.close()
+            sharedData.unlink()
+
+    def Shutdown(self):
+        with self.lock:
+            executors = list(self.executors.values())
+            self.executors.clear()
+            self.workers = 0
+        for executor in executors: executor.shutdown()
+
+# worker processes shared by every AES_Program
+processPool = AESProcessPool()
+
+class AESThreadPool(AESProcessPool):
+    # the same, with threads of this process (for many small messages, see AES_Program.EncryptBatch)
+    executorClass = ThreadPoolExecutor
+
+# threads shared by every AES_Program
+threadPool = AESThreadPool()
@@ -0,0 +1,71 @@
+
+# asyncio driver of the incremental encryptors and decryptors (AES_Program.EncryptStream and DecryptStream)
+
+import asyncio
+
+from .AES_Core import AES_Program
+from .AES_Pool import threadPool
+
+class AESStream:
+    # runs an incremental encryptor or decryptor on data coming from asyncio:
+    # the input is read in chunks of at most chunkLength bytes, and chunks of at least offloadLength bytes
+    # are processed on threadPool, so the event loop keeps serving other connections meanwhile.
+    # reading runs ahead of processing, but at most maxInFlight bytes are held (read and not written yet),
+    # and a slow writer (StreamWriter.drain()) holds reading back in turn
+
+    def __init__(self, cryptor, chunkLength = 1 << 16, maxInFlight = 1 << 20, offloadLength = 1 << 12, program = None):
+        self.program = program if program is not None else AES_Program()
+        self.cryptor = cryptor
+        self.chunkLength = chunkLength
+        self.offloadLength = offloadLength
+        # the chunk being processed is not in the queue
+        self.queueLength = max(1, maxInFlight // chunkLength - 1)
+
+    async def Pipe(self, source, writer):
+        # write the result of everything read from source to writer, returns how many bytes were written
+        written = 0
+        async for piece in self.Chunks(source):
+            writer.write(piece)
+            written += len(piece)
+            await writer.drain()
+        return written
+
+    async def Chunks(self, source):
+        # async iterator of the results of the chunks read from source (finalize() included)
+        queue = asyncio.Queue(self.queueLength)
+        reader = asyncio.ensure_future(self.Read(source, queue))
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None: break
+                if isinstance(chunk, BaseException): raise chunk
+                piece = await self.Process(self.cryptor.update, chunk)
+                if piece: yield piece
+            piece = self.cryptor.finalize()
+            if piece: yield piece
+        finally:
+            reader.cancel()
+
+    async def Read(self, source, queue):
+        # put chunks of source in queue, then None (or the exception that stopped reading)
+        try:
+            if hasattr(source, 'read'):
+                while True:
+                    chunk = await source.read(self.chunkLength)
+                    if not chunk: break
+                    await queue.put(chunk)
+            else:
+                async for piece in source:
+                    piece = memoryview(piece).cast('B')
+                    for start in range(0, len(piece), self.chunkLength):
+                        await queue.put(bytes(piece[start:start + self.chunkLength]))
+        except Exception as exception:
+            await queue.put(exception)
+            return
+        await queue.put(None)
+
+    async def Process(self, function, chunk):
+        if len(chunk) < self.offloadLength or self.program.batchWorkers == 0:
+            return function(chunk)
+        executor = threadPool.GetExecutor(self.program.batchWorkers)
+        return await asyncio.get_running_loop().run_in_executor(executor, function, chunk)
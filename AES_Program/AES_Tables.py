@@ -0,0 +1,102 @@
+
+# lookup tables of AES and GHASH. importing this module computes nothing: each group of tables
+# is generated the first time one of its tables is used (AES_Tables.s_box, AES_Tables.Te0...),
+# then it is an ordinary module attribute. generating all of them takes about a millisecond
+
+    # The round constants used in key expansion.
+    # rcon[0] is never actually used, while rcon[i] could also
+    # be computed during runtime as AES.mul(1 << (i - 1), 1).
+
+rcon = [0, 1, 2, 4, 8, 16, 32, 64, 128, 27, 54]
+
+# matrices used by the MixColumn function, by which it multiplies the coulmns
+MixColumnMatrix = [[2, 3, 1, 1], [1, 2, 3, 1], [1, 1, 2, 3], [3, 1, 1, 2]]
+MixColumnMatrixInv = [[14, 11, 13, 9],[9, 14, 11, 13],[13, 9, 14, 11],[11, 13, 9, 14]]
+
+# GHASH (GCM mode): the field polynomial x^128 + x^7 + x^2 + x + 1, as it is
+# xored into a number shifted one bit down (bit 0 of the field is the highest bit)
+ghashPolynomial = 0xe1 << 120
+
+def galoisMultiply(a, b):
+    # product of two bytes in GF(2^8) modulo x^8 + x^4 + x^3 + x + 1
+    product = 0
+    while b:
+        if b & 1: product ^= a
+        a = ((a << 1) ^ 0x11b) if a & 0x80 else a << 1
+        b >>= 1
+    return product
+
+def makeSBoxes():
+    # The S-box and inverse S-box used in SubBytes() and InvSubBytes():
+    # S[x] is the multiplicative inverse of x in GF(2^8) (0 for 0) put through the affine transformation
+    # b ^ (b <<< 1) ^ (b <<< 2) ^ (b <<< 3) ^ (b <<< 4) ^ 0x63. powers of 3 run through all non-zero bytes,
+    # so the inverse of 3^i is 3^(255 - i)
+    powers = []
+    power = 1
+    for i in range(255):
+        powers.append(power)
+        power ^= galoisMultiply(power, 2)
+    logarithms = {power: i for i, power in enumerate(powers)}
+    sBox = bytearray(256)
+    invSBox = bytearray(256)
+    for x in range(256):
+        inverse = powers[(255 - logarithms[x]) % 255] if x else 0
+        s = inverse ^ 0x63
+        for shift in range(1, 5):
+            s ^= ((inverse << shift) | (inverse >> (8 - shift))) & 255
+        sBox[x] = s
+        invSBox[s] = x
+    return {'s_box': bytes(sBox), 'inv_s_box': bytes(invSBox)}
+
+def makeGaloisTables():
+    # lookup tables used by the MixColumn function to make multiplication easier:
+    # galMulN[x] is N * x in GF(2^8), for the entries of MixColumnMatrix and MixColumnMatrixInv
+    return {'galMul{}'.format(n): bytes(galoisMultiply(x, n) for x in range(256)) for n in (2, 3, 9, 11, 13, 14)}
+
+# shifts a 32-bit column word n bytes down (rotates it to the right)
+def rotateColumnWord(word, n):
+    return ((word >> (8 * n)) | (word << (32 - 8 * n))) & 0xffffffff
+
+def makeRoundTables():
+    # round tables used by AESTTable, each entry is a whole column word:
+    # Te0[x] is the column (2*S[x], S[x], S[x], 3*S[x]) - SubBytes followed by MixColumns of a byte in row 0,
+    # Te1-Te3 are the same column rotated for bytes in rows 1-3.
+    # Td0-Td3 are built the same way from inv_s_box and the InvMixColumns multipliers (14, 9, 13, 11).
+    # lists, not bytes - these are looked up for every byte of every round
+    galMul2, galMul3, galMul9, galMul11, galMul13, galMul14 = [Table('galMul{}'.format(n)) for n in (2, 3, 9, 11, 13, 14)]
+    Te0 = [(galMul2[s] << 24) | (s << 16) | (s << 8) | galMul3[s] for s in Table('s_box')]
+    Td0 = [(galMul14[s] << 24) | (galMul9[s] << 16) | (galMul13[s] << 8) | galMul11[s] for s in Table('inv_s_box')]
+    tables = {}
+    for n in range(4):
+        tables['Te{}'.format(n)] = [rotateColumnWord(w, n) for w in Te0]
+        tables['Td{}'.format(n)] = [rotateColumnWord(w, n) for w in Td0]
+    return tables
+
+def makeGhashReduction():
+    # what to xor into y >> 8 for each possible value of the 8 bits shifted out
+    reduction = []
+    for low in range(256):
+        value = low
+        for i in range(8):
+            value = (value >> 1) ^ (ghashPolynomial if value & 1 else 0)
+        reduction.append(value)
+    return {'ghashReduction': reduction}
+
+# table name -> the function generating it (with the other tables of its group)
+generators = {'s_box': makeSBoxes, 'inv_s_box': makeSBoxes, 'ghashReduction': makeGhashReduction}
+generators.update({'galMul{}'.format(n): makeGaloisTables for n in (2, 3, 9, 11, 13, 14)})
+generators.update({'{}{}'.format(kind, n): makeRoundTables for kind in ('Te', 'Td') for n in range(4)})
+
+def Table(name):
+    # the table, generated if it was not used yet (module attributes of the tables
+    # are only looked up through __getattr__ from outside of this module)
+    table = globals().get(name)
+    return table if table is not None else __getattr__(name)
+
+def __getattr__(name):
+    # called for the names not defined yet: generates the group of tables of name.
+    # two threads may both generate it, they get equal tables
+    if name not in generators:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals().update(generators[name]())
+    return globals()[name]
@@ -0,0 +1,43 @@
+
+# AES cipher - software implementation with ECB, CBC, CTR, GCM and XTS modes,
+# written in Python 3, without any cryptographic libraries.
+#   import AES_Program
+#   cryptogram = AES_Program.AES_Program().EncryptBytesAES_CBC(message, key, IV)
+# importing the package has no side effects and is fast: the lookup tables are generated
+# the first time they are used (AES_Tables), numpy is imported the first time a batch engine
+# could use it, and the parts that need multiprocessing, asyncio or zlib (AES_Pool, AES_Stream,
+# AES_Container) are imported the first time one of their names is used.
+# python -m AES_Program runs the tests
+
+from .AES_Core import (
+    AES_Program, AES, AESKeySchedule, AESKeyScheduleCache, keyScheduleCache,
+    AESTTable, AESNumpy, AESBitslice, LoadNumpy,
+    AESEngine, AESReferenceEngine, AESTTableEngine, AESNumpyEngine, AESBitsliceEngine, AESPoolEngine,
+    AESEngineRegistry, engines, CryptBlocksInPlace,
+    AESCipher, AESEncryptor, AESDecryptor, AESKeystreamPrefetcher, AESGHASH,
+    AESCTRCryptor, AESGCMEncryptor, AESGCMDecryptor,
+    AESInstrumentation, instrumentation,
+    byteLength, blockWords, xorBytes, sxor, rotateWord,
+)
+from . import AES_Tables
+
+# name -> module that defines it, imported on first use
+lazyNames = {
+    'AESProcessChunk': 'AES_Pool', 'AESProcessPool': 'AES_Pool', 'processPool': 'AES_Pool',
+    'AESThreadPool': 'AES_Pool', 'threadPool': 'AES_Pool',
+    'AESStream': 'AES_Stream',
+    'AESContainer': 'AES_Container', 'AESContainerWriter': 'AES_Container',
+    'AESContainerReader': 'AES_Container', 'AESContainerChunk': 'AES_Container',
+}
+
+def __getattr__(name):
+    if name in lazyNames:
+        import importlib
+        return getattr(importlib.import_module('.' + lazyNames[name], __name__), name)
+    if name == 'numpy':
+        # the numpy module (None when it is not installed)
+        return LoadNumpy()
+    if name in AES_Tables.generators or name in ('rcon', 'MixColumnMatrix', 'MixColumnMatrixInv', 'ghashPolynomial'):
+        # s_box, inv_s_box, galMul2..., Te0..., generated on first use
+        return getattr(AES_Tables, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,5 @@
+
+# python -m AES_Program: run the tests
+from .AES_Core import AES_Program
+
+AES_Program().Tests()